@@ -1,26 +1,29 @@
 import pandas as pd
-import openpyxl
 from pathlib import Path
 
+# Rust-backed calamine reader when python-calamine is installed, openpyxl otherwise
+try:
+    import python_calamine  # noqa: F401
+    excel_engine = 'calamine'
+except ImportError:
+    excel_engine = 'openpyxl'
+
 # Load the Excel file
 file_path = Path(r"c:\Q2\second quarter.xlsx")
 print(f"Analyzing: {file_path.name}\n")
 print("="*80)
 
-# Get all sheet names
-excel_file = pd.ExcelFile(file_path)
-print(f"\nSheet Names: {excel_file.sheet_names}")
-print(f"Number of Sheets: {len(excel_file.sheet_names)}\n")
+# Read every sheet in a single pass over the workbook
+sheets = pd.read_excel(file_path, sheet_name=None, engine=excel_engine)
+print(f"\nSheet Names: {list(sheets)}")
+print(f"Number of Sheets: {len(sheets)}\n")
 
 # Analyze each sheet
-for sheet_name in excel_file.sheet_names:
+for sheet_name, df in sheets.items():
     print("\n" + "="*80)
     print(f"SHEET: {sheet_name}")
     print("="*80)
     
-    # Read the sheet
-    df = pd.read_excel(file_path, sheet_name=sheet_name)
-    
     print(f"\nShape: {df.shape[0]} rows × {df.shape[1]} columns")
     print(f"\nColumns: {list(df.columns)}")
     
@@ -30,8 +33,13 @@ for sheet_name in excel_file.sheet_names:
     print("\n--- Data Types ---")
     print(df.dtypes)
     
+    # Numeric columns only: describe(include='all') builds a frequency table for every text column
+    numeric_cols = df.select_dtypes(include=['number']).columns
     print("\n--- Basic Statistics ---")
-    print(df.describe(include='all'))
+    if len(numeric_cols) > 0:
+        print(df[numeric_cols].describe())
+    else:
+        print("No numeric columns")
     
     print("\n--- Missing Values ---")
     missing = df.isnull().sum()
@@ -40,16 +48,16 @@ for sheet_name in excel_file.sheet_names:
     else:
         print("No missing values")
     
-    # Check for numeric columns and provide additional insights
-    numeric_cols = df.select_dtypes(include=['number']).columns
+    # Additional insights for numeric columns
     if len(numeric_cols) > 0:
         print("\n--- Numeric Column Summary ---")
-        for col in numeric_cols:
-            print(f"\n{col}:")
-            print(f"  Total: {df[col].sum()}")
-            print(f"  Mean: {df[col].mean():.2f}")
-            print(f"  Min: {df[col].min()}")
-            print(f"  Max: {df[col].max()}")
+        # One row per column: Total / Mean / Min / Max
+        # (object dtype keeps the integer totals and extremes exact instead of upcasting them to float;
+        # only the mean is rounded to two decimals, as the per-column printout had it)
+        summary = df[numeric_cols].agg(['sum', 'min', 'max']).astype(object).T
+        summary.insert(1, 'mean', df[numeric_cols].mean())
+        summary.columns = ['Total', 'Mean', 'Min', 'Max']
+        print(summary.to_string(formatters={'Mean': '{:.2f}'.format}))
 
 print("\n" + "="*80)
 print("Analysis Complete!")
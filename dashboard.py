@@ -4,6 +4,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 import numpy as np
+import hashlib
+import io
+import shutil
+from functools import cached_property
 
 # Page configuration
 st.set_page_config(
@@ -24,12 +28,6 @@ st.markdown("""
         padding: 10px;
         border-radius: 5px;
     }
-    /* Responsive header logo: scales with container, ~20% smaller */
-    .header-logo img {
-        width: 80%; /* 20% smaller than container */
-        height: auto;
-        max-width: 160px; /* cap size for large screens */
-    }
     .center-title {
         color: #0a4a6e;
         font-weight: 700;
@@ -45,19 +43,298 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# Load data
-@st.cache_data
-def load_data(file_path):
-    programs_df = pd.read_excel(file_path, sheet_name='برامج الربع الثانى')
-    trainees_df = pd.read_excel(file_path, sheet_name='بيانات المتدربين')
-    registration_df = pd.read_excel(file_path, sheet_name='تسجيل المتدربين')
-    return programs_df, trainees_df, registration_df
+# Read-only Overview charts: no hover/zoom wiring and no Streamlit theme pass on the client
+STATIC_CFG = {'staticPlot': True, 'displayModeBar': False}
+# Detail tables send at most this many rows to the browser
+MAX_TABLE_ROWS = 500
 
 # Default file path - use relative path for deployment compatibility
 import os
 script_dir = Path(__file__).parent if '__file__' in globals() else Path.cwd()
 default_file = script_dir / "second quarter.xlsx"
 
+# Parsed sheets are cached as Parquet under .cache/sheets/<workbook key hash>/ so restarts skip openpyxl
+# (a directory of its own, since stale versions are pruned and report_generator.py also caches under .cache)
+cache_dir = script_dir / ".cache" / "sheets"
+SHEET_NAMES = ('برامج الربع الثانى', 'بيانات المتدربين', 'تسجيل المتدربين')
+
+# Rust-backed calamine reader when python-calamine is installed, openpyxl otherwise
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Low-cardinality text columns hit by value_counts/nunique/isin/groupby in every view
+CATEGORICAL_COLS = {
+    'برامج الربع الثانى': ['البرنامج التدريبي', 'مكان التنفيذ'],
+    'بيانات المتدربين': ['الوظيفة', 'المؤهل الدراسي', 'مكان العمل'],
+    'تسجيل المتدربين': ['البرنامج التدريبي', 'مكان التدريب(محافظة)', 'مكان التدريب', 'المحافظة', 'البرنامج التدريبي ID'],
+}
+# Numeric columns coerced once at load instead of pd.to_numeric(..., errors='coerce') at every use
+# (the exam result columns are pass/fail labels and stay text for _success_rate)
+NUMERIC_COLS = {
+    'تسجيل المتدربين': ['Attendance', 'عدد أيام الدورة', 'الامتحان المبدئي', 'الامتحان النهائي'],
+}
+
+def _arrow_safe(df):
+    # Mixed-type object columns (e.g. Score: "14 / 155" next to plain ints) can't be written to Parquet
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def _prepare_sheet(df, sheet):
+    for col in CATEGORICAL_COLS[sheet]:
+        if col in df.columns:
+            # Categories in first-appearance order so value_counts ties rank as they did on plain strings
+            df[col] = df[col].astype(pd.CategoricalDtype(df[col].dropna().unique()))
+    for col in NUMERIC_COLS.get(sheet, []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    return df
+
+def workbook_key(file_path):
+    # Cheap stand-in for the workbook contents: path + mtime + size, or the upload's name, size and first 64KB
+    if hasattr(file_path, 'getbuffer'):
+        return (file_path.name, file_path.size, hashlib.sha1(file_path.getbuffer()[:65536]).hexdigest())
+    st_ = Path(file_path).stat()
+    return (str(file_path), st_.st_mtime_ns, st_.st_size)
+
+def _sheet_cache_dir(data_key):
+    return cache_dir / hashlib.blake2b(repr(data_key).encode(), digest_size=8).hexdigest()
+
+@st.cache_data(max_entries=1)
+def parse_workbook(data_key, _file_path):
+    # Every sheet in one read_excel call, so a cold start opens and unzips the workbook once
+    source = io.BytesIO(_file_path.getvalue()) if hasattr(_file_path, 'getvalue') else _file_path
+    sheets = pd.read_excel(source, sheet_name=list(SHEET_NAMES), engine=EXCEL_ENGINE)
+    sheets = {name: _prepare_sheet(_arrow_safe(df), name) for name, df in sheets.items()}
+    sheet_dir = _sheet_cache_dir(data_key)
+    try:
+        sheet_dir.mkdir(parents=True, exist_ok=True)
+        for name, df in sheets.items():
+            parquet_path = sheet_dir / f"{name}.parquet"
+            tmp_path = parquet_path.with_suffix('.tmp')
+            df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+            tmp_path.replace(parquet_path)
+        # Only the current workbook version is ever read again, so older ones are dropped
+        for old_dir in cache_dir.iterdir():
+            if old_dir != sheet_dir:
+                shutil.rmtree(old_dir, ignore_errors=True)
+    except OSError:
+        pass  # Read-only deployment: keep serving from the in-memory result
+    return sheets
+
+# Load data: one cached loader per sheet so each view only reads the sheets it uses
+@st.cache_data
+def load_sheet(data_key, sheet, _file_path):
+    parquet_path = _sheet_cache_dir(data_key) / f"{sheet}.parquet"
+    if parquet_path.exists():
+        return _prepare_sheet(pd.read_parquet(parquet_path, engine='pyarrow'), sheet)
+    return parse_workbook(data_key, _file_path)[sheet]
+
+class LazyData:
+    """Sheets of one workbook, each loaded through load_sheet the first time a view reads it."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    @cached_property
+    def key(self):
+        # Passed to the cached aggregates in place of the frames, which are then skipped by the hasher (_-prefixed)
+        try:
+            return workbook_key(self.file_path)
+        except OSError as e:
+            st.error(f"❌ Error loading data: {str(e)}")
+            st.stop()
+
+    def _load(self, sheet):
+        try:
+            return load_sheet(self.key, sheet, self.file_path)
+        except Exception as e:
+            st.error(f"❌ Error loading data: {str(e)}")
+            st.stop()
+
+    @cached_property
+    def programs(self):
+        return self._load(SHEET_NAMES[0])
+
+    @cached_property
+    def trainees(self):
+        return self._load(SHEET_NAMES[1])
+
+    @cached_property
+    def registration(self):
+        return self._load(SHEET_NAMES[2])
+
+# Calculate exam success rates using adaptive logic (0/1 labels or numeric percentages)
+def _success_rate(series):
+    if series is None:
+        return 0.0
+    s = series.dropna()
+    if s.empty:
+        return 0.0
+    if pd.api.types.is_numeric_dtype(s):
+        # Already-numeric (pre-coerced) columns skip the string clean-up below
+        nums = s.to_numpy(dtype=float)
+    else:
+        s_clean = s.astype(str).str.strip().str.replace('%', '', regex=False).str.replace(',', '.', regex=False)
+        # Try numeric first
+        parsed = pd.to_numeric(s_clean, errors='coerce')
+        numeric_ratio = parsed.notna().mean()
+        if numeric_ratio < 0.5:
+            # Textual pass labels
+            lower = s_clean.str.lower()
+            pass_labels = ['pass', 'passed', 'ناجح', 'نجاح', 'true', 'yes', '1']
+            pass_mask = lower.isin(pass_labels)
+            return float(pass_mask.mean() * 100)
+        nums = parsed.to_numpy(dtype=float)
+    # If looks like 0/1 data, treat 1 as pass; otherwise use >=60
+    if np.nanmax(nums) <= 1.05:
+        passed = np.count_nonzero(nums == 1)
+    else:
+        passed = np.count_nonzero(nums >= 60)
+    return float(passed / nums.size * 100)
+
+def top_k_counts(s, k=10):
+    # Count then select the k largest; avoids sorting every unique value like value_counts().head(k)
+    return s.groupby(s, sort=False, observed=True).size().nlargest(k)
+
+def cat_isin_mask(series, selected):
+    # isin on a categorical column as an integer compare of its codes against the selected categories' codes
+    cats = series.cat.categories
+    sel_codes = np.asarray([cats.get_loc(v) for v in selected if v in cats], dtype=series.cat.codes.dtype)
+    return np.isin(series.cat.codes.to_numpy(), sel_codes)
+
+def show_table(df):
+    # Only the first MAX_TABLE_ROWS rows are serialized; the full count goes in a caption
+    st.dataframe(df.head(MAX_TABLE_ROWS), use_container_width=True, height=400)
+    if len(df) > MAX_TABLE_ROWS:
+        st.caption(f"Showing the first {MAX_TABLE_ROWS:,} of {len(df):,} rows")
+
+@st.cache_data
+def make_gauge(value, target, title, axis_max, steps, bar_color):
+    # Gauge figure as a plain dict keyed on its scalar inputs; steps is a tuple of (low, high, color)
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=value,
+        number={'suffix': '', 'valueformat': 'd'},
+        delta={'reference': target, 'valueformat': 'd', 'suffix': f' {value - target:+.0f}'},
+        title={'text': title},
+        gauge={
+            'axis': {'range': [0, axis_max]},
+            'bar': {'color': bar_color},
+            'steps': [{'range': [low, high], 'color': color} for low, high, color in steps]
+        }
+    ))
+    fig.update_layout(height=350)
+    return fig.to_dict()
+
+def fast_hist(values, nbins=20, labels=None, title=None):
+    # Bin server-side so only nbins bars are serialized to the browser instead of every value
+    arr = np.asarray(values, dtype=float)
+    counts, edges = np.histogram(arr[~np.isnan(arr)], bins=nbins)
+    fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, labels=labels, title=title)
+    fig.update_layout(bargap=0)
+    return fig
+
+# Cached aggregates: every widget interaction reruns the script, so anything derived
+# only from the loaded sheets is computed once per dataset instead of once per rerun.
+# The frames are _-prefixed so Streamlit doesn't hash them on every call; data_key identifies the workbook.
+@st.cache_data
+def overview_stats(data_key, _registration_df, _programs_df, _trainees_df):
+    registration_df, programs_df, trainees_df = _registration_df, _programs_df, _trainees_df
+    total_registrations = len(registration_df)  # Total registrations: 1,573
+    planned_sessions = len(programs_df)  # Planned sessions from Programs sheet: 110
+    planned_capacity = planned_sessions * 17.75 if planned_sessions > 0 else 0  # Planned capacity: 1,945 seats
+    final_success_rate = _success_rate(registration_df.get('نتيجة الإمتحان النهائي'))
+    # Average of numeric final exam scores if available; fallback to final success rate
+    final_exam_scores = registration_df.get('الامتحان النهائي', pd.Series(dtype='float32'))
+    return {
+        'num_governorates': registration_df['المحافظة'].nunique(),
+        'unique_programs': registration_df['البرنامج التدريبي'].nunique(),  # Programs with registrations: 13
+        'total_registrations': total_registrations,
+        'unique_trainees': trainees_df['الرقم القومي'].nunique() if 'الرقم القومي' in trainees_df.columns else len(trainees_df),  # Unique by National ID: 1,432
+        'planned_sessions': planned_sessions,
+        'planned_capacity': planned_capacity,
+        'utilization_rate': (total_registrations / planned_capacity * 100) if planned_capacity > 0 else 0,  # ~80.9%
+        'initial_success_rate': _success_rate(registration_df.get('نتيجة الإمتحان المبدئي')),
+        'final_success_rate': final_success_rate,
+        'avg_final_exam_success': (
+            float(final_exam_scores.mean())
+            if final_exam_scores.notna().sum() > 0
+            else final_success_rate
+        ),
+        'program_counts': top_k_counts(registration_df['البرنامج التدريبي']),
+        'location_counts': programs_df['مكان التنفيذ'].value_counts(),
+        'gov_counts': top_k_counts(registration_df['مكان التدريب(محافظة)']),
+        'duration_counts': registration_df['عدد أيام الدورة'].value_counts().sort_index(),
+    }
+
+@st.cache_data
+def unique_vals(data_key, sheet, col, _df):
+    # Filter options in first-appearance order, as an immutable tuple for the widget state
+    return tuple(_df[col].dropna().unique())
+
+@st.cache_data
+def registration_stats(data_key, _registration_df):
+    registration_df = _registration_df
+    return {
+        'avg_attendance': registration_df['Attendance'].mean(),
+        'avg_duration': registration_df['عدد أيام الدورة'].mean(),
+        'unique_courses': registration_df['البرنامج التدريبي'].nunique(),
+        'unique_locations': registration_df['مكان التدريب'].nunique(),
+    }
+
+@st.cache_data
+def trainee_stats(data_key, _trainees_df):
+    # Distinct counts for the Trainees metrics and status panel in one nunique() pass
+    cols = ['الوظيفة', 'المؤهل الدراسي', 'مكان العمل', 'رقم الموبايل', 'الرقم القومي']
+    return _trainees_df[cols].nunique().astype(int).to_dict()
+
+@st.cache_data
+def filter_reg(data_key, programs, govs, attendance_min, _registration_df):
+    # Callers pass sorted tuples so the same selection in any order hits the cache
+    registration_df = _registration_df
+    mask = (
+        cat_isin_mask(registration_df['البرنامج التدريبي'], programs) &
+        cat_isin_mask(registration_df['مكان التدريب(محافظة)'], govs) &
+        (registration_df['Attendance'].to_numpy() >= attendance_min)
+    )
+    return registration_df[mask]
+
+@st.cache_data
+def comparison_stats(data_key, _programs_df, _registration_df):
+    programs_df, registration_df = _programs_df, _registration_df
+    capacity = len(programs_df) * 17.75
+
+    # Aggregate by program and align the two counts on the program name index
+    # (string index so the outer join comes out in alphabetical order, as the old merge did)
+    plan = programs_df.groupby('البرنامج التدريبي', observed=True).size().rename(index=str)
+    actual = registration_df.groupby('البرنامج التدريبي', observed=True).size().rename(index=str)
+    comparison = pd.concat(
+        [plan, actual], axis=1, keys=['planned_courses', 'actual_registrations'], sort=True
+    ).fillna(0).rename_axis('البرنامج التدريبي').reset_index()
+
+    # Capacity and rate on the raw arrays (in-place, no intermediate Series);
+    # programs with no planned courses keep the inf rate the Series division gave
+    program_capacity = comparison['planned_courses'].to_numpy(dtype=float) * 17.75
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = comparison['actual_registrations'].to_numpy(dtype=float) / program_capacity
+    rate *= 100
+    comparison['planned_capacity'] = program_capacity
+    comparison['fulfillment_rate'] = rate.round(1)
+    comparison = comparison.sort_values('planned_courses', ascending=False).head(15)
+
+    return {
+        'planned_capacity': capacity,
+        'enrollment_rate': (len(registration_df) / capacity * 100) if capacity > 0 else 0,
+        'avg_attendance': registration_df['Attendance'].mean(),
+        'comparison': comparison,
+        'location_dist': top_k_counts(programs_df['مكان التنفيذ']),
+        'gov_dist': top_k_counts(registration_df['مكان التدريب(محافظة)']),
+    }
+
 # File uploader in sidebar
 st.sidebar.header("📁 Data Source")
 uploaded_file = st.sidebar.file_uploader(
@@ -74,27 +351,17 @@ else:
     st.sidebar.info("📂 Using default file: second quarter.xlsx")
     file_to_use = default_file
 
-# Load the data
-try:
-    programs_df, trainees_df, registration_df = load_data(file_to_use)
-    st.sidebar.success(f"✅ Data loaded successfully!")
-    st.sidebar.metric("Last Updated", pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"))
-except Exception as e:
-    st.error(f"❌ Error loading data: {str(e)}")
-    st.stop()
+# Sheets are only parsed when a view first reads them; the load status is filled in after the view renders
+data = LazyData(file_to_use)
+load_status = st.sidebar.container()
 
 # Top banner with logo and title
 logo_path = script_dir / "assets" / "logo.png"
 col_logo, col_title = st.columns([1, 5])
 with col_logo:
     if logo_path.exists():
-        import base64
-        logo_bytes = logo_path.read_bytes()
-        logo_b64 = base64.b64encode(logo_bytes).decode('utf-8')
-        st.markdown(
-            f'<div class="header-logo"><img src="data:image/png;base64,{logo_b64}" alt="Logo"/></div>',
-            unsafe_allow_html=True
-        )
+        # Served from Streamlit's media endpoint, so the browser caches it across reruns
+        st.image(str(logo_path), width=160)
     else:
         st.caption("Add logo.png to assets for header logo")
 
@@ -121,25 +388,21 @@ if sheet_view == "Overview":
     st.header("📈 Overview Statistics")
     
     # Calculate key metrics (aligned with reference data)
-    num_governorates = registration_df['المحافظة'].nunique()
-    unique_programs = registration_df['البرنامج التدريبي'].nunique()  # Programs with registrations: 13
-    total_registrations = len(registration_df)  # Total registrations: 1,573
-    unique_trainees = trainees_df['الرقم القومي'].nunique() if 'الرقم القومي' in trainees_df.columns else len(trainees_df)  # Unique by National ID: 1,432
-    planned_sessions = len(programs_df)  # Planned sessions from Programs sheet: 110
-    planned_capacity = planned_sessions * 17.75 if planned_sessions > 0 else 0  # Planned capacity: 1,945 seats
-    utilization_rate = (total_registrations / planned_capacity * 100) if planned_capacity > 0 else 0  # ~80.9%
-    
+    stats = overview_stats(data.key, data.registration, data.programs, data.trainees)
+    total_registrations = stats['total_registrations']
+    planned_sessions = stats['planned_sessions']
+
     # Key metrics row (target trainees metric removed per request)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.metric("إجمالي التسجيلات", f"{total_registrations:,}")
     with col2:
-        st.metric("المتدربون الفريدون", f"{unique_trainees:,}")
+        st.metric("المتدربون الفريدون", f"{stats['unique_trainees']:,}")
     with col3:
-        st.metric("البرامج", unique_programs)
+        st.metric("البرامج", stats['unique_programs'])
     with col4:
-        st.metric("معدل الاستفادة", f"{utilization_rate:.1f}%")
+        st.metric("معدل الاستفادة", f"{stats['utilization_rate']:.1f}%")
     
     st.markdown("---")
     
@@ -149,50 +412,30 @@ if sheet_view == "Overview":
     # Gauge 1: Planned Sessions Achievement
     with col1:
         planned_sessions_target = 110  # From reference: planned sessions
-        sessions_delta = planned_sessions - planned_sessions_target
         
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=planned_sessions,
-            number={'suffix': '', 'valueformat': 'd'},
-            delta={'reference': planned_sessions_target, 'valueformat': 'd', 'suffix': f' {sessions_delta:+.0f}'},
-            title={'text': f"الجلسات المخطط لها<br><sub>Goal: {planned_sessions_target}</sub>"},
-            gauge={
-                'axis': {'range': [0, 130]},
-                'bar': {'color': 'seagreen'},
-                'steps': [
-                    {'range': [0, 55], 'color': '#ffe6e6'},
-                    {'range': [55, 88], 'color': '#fff4e6'},
-                    {'range': [88, 130], 'color': '#e6f3ff'}
-                ]
-            }
+        fig = go.Figure(make_gauge(
+            planned_sessions,
+            planned_sessions_target,
+            f"الجلسات المخطط لها<br><sub>Goal: {planned_sessions_target}</sub>",
+            130,
+            ((0, 55, '#ffe6e6'), (55, 88, '#fff4e6'), (88, 130, '#e6f3ff')),
+            'seagreen'
         ))
-        fig.update_layout(height=350)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CFG, theme=None)
     
     # Gauge 2: Capacity Utilization
     with col2:
-        capacity_target = int(planned_capacity)  # Planned capacity: ~1,945 seats
-        capacity_delta = total_registrations - capacity_target
+        capacity_target = int(stats['planned_capacity'])  # Planned capacity: ~1,945 seats
         
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=total_registrations,
-            number={'suffix': '', 'valueformat': 'd'},
-            delta={'reference': capacity_target, 'valueformat': 'd', 'suffix': f' {capacity_delta:+.0f}'},
-            title={'text': f"التسجيلات من السعة المخطط لها<br><sub>Capacity: {capacity_target:,}</sub>"},
-            gauge={
-                'axis': {'range': [0, 2500]},
-                'bar': {'color': 'royalblue'},
-                'steps': [
-                    {'range': [0, 1000], 'color': '#ffe6e6'},
-                    {'range': [1000, 1600], 'color': '#fff4e6'},
-                    {'range': [1600, 2500], 'color': '#e6f3ff'}
-                ]
-            }
+        fig = go.Figure(make_gauge(
+            total_registrations,
+            capacity_target,
+            f"التسجيلات من السعة المخطط لها<br><sub>Capacity: {capacity_target:,}</sub>",
+            2500,
+            ((0, 1000, '#ffe6e6'), (1000, 1600, '#fff4e6'), (1600, 2500, '#e6f3ff')),
+            'royalblue'
         ))
-        fig.update_layout(height=350)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CFG, theme=None)
     
     
     st.markdown("---")
@@ -200,47 +443,12 @@ if sheet_view == "Overview":
     # Exam Success Rates KPIs (mirroring provided design)
     col1, col2, col3 = st.columns(3)
 
-    # Calculate exam success rates using adaptive logic (0/1 labels or numeric percentages)
-    def _success_rate(series):
-        if series is None:
-            return 0.0
-        s = series.dropna()
-        if s.empty:
-            return 0.0
-        s_clean = s.astype(str).str.strip().str.replace('%', '', regex=False).str.replace(',', '.', regex=False)
-        # Try numeric first
-        nums = pd.to_numeric(s_clean, errors='coerce')
-        numeric_ratio = nums.notna().mean()
-        if numeric_ratio >= 0.5:
-            # If looks like 0/1 data, treat 1 as pass; otherwise use >=60
-            if nums.max() <= 1.05:
-                pass_mask = nums == 1
-            else:
-                pass_mask = nums >= 60
-        else:
-            # Textual pass labels
-            lower = s_clean.str.lower()
-            pass_labels = ['pass', 'passed', 'ناجح', 'نجاح', 'true', 'yes', '1']
-            pass_mask = lower.isin(pass_labels)
-        return float(pass_mask.mean() * 100)
-
-    initial_success_rate = _success_rate(registration_df.get('نتيجة الإمتحان المبدئي'))
-    final_success_rate = _success_rate(registration_df.get('نتيجة الإمتحان النهائي'))
-
-    # Average of numeric final exam scores if available; fallback to final success rate
-    final_exam_scores = pd.to_numeric(registration_df.get('الامتحان النهائي'), errors='coerce')
-    avg_final_exam_success = (
-        float(final_exam_scores.mean())
-        if final_exam_scores.notna().sum() > 0
-        else final_success_rate
-    )
-
     with col1:
-        st.metric("متوسط النجاح في الإمتحان النهائي", f"{avg_final_exam_success:.2f}%")
+        st.metric("متوسط النجاح في الإمتحان النهائي", f"{stats['avg_final_exam_success']:.2f}%")
     with col2:
-        st.metric("نسبة نجاح المتدربين في الإمتحان المبدئي", f"{initial_success_rate:.2f}%")
+        st.metric("نسبة نجاح المتدربين في الإمتحان المبدئي", f"{stats['initial_success_rate']:.2f}%")
     with col3:
-        st.metric("نسبة نجاح المتدربين في الإمتحان النهائي", f"{final_success_rate:.2f}%")
+        st.metric("نسبة نجاح المتدربين في الإمتحان النهائي", f"{stats['final_success_rate']:.2f}%")
     
     st.markdown("---")
     
@@ -249,7 +457,7 @@ if sheet_view == "Overview":
     
     with col1:
         st.subheader("📚 Top Training Programs")
-        program_counts = registration_df['البرنامج التدريبي'].value_counts().head(10)
+        program_counts = stats['program_counts']
         fig = px.bar(
             x=program_counts.values,
             y=program_counts.index,
@@ -259,11 +467,11 @@ if sheet_view == "Overview":
         )
         fig.update_traces(text=program_counts.values, textposition='outside')
         fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CFG, theme=None)
     
     with col2:
         st.subheader("🏢 Training Locations")
-        location_counts = programs_df['مكان التنفيذ'].value_counts()
+        location_counts = stats['location_counts']
         fig = px.pie(
             values=location_counts.values,
             names=location_counts.index,
@@ -271,14 +479,14 @@ if sheet_view == "Overview":
         )
         fig.update_traces(textinfo="label+percent+value")
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CFG, theme=None)
     
     # Full width charts
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📍 Training by Governorate")
-        gov_counts = registration_df['مكان التدريب(محافظة)'].value_counts().head(10)
+        gov_counts = stats['gov_counts']
         fig = px.bar(
             x=gov_counts.index,
             y=gov_counts.values,
@@ -287,11 +495,11 @@ if sheet_view == "Overview":
         )
         fig.update_traces(text=gov_counts.values, textposition='outside')
         fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CFG, theme=None)
     
     with col2:
         st.subheader("📅 Course Duration Distribution")
-        duration_counts = pd.to_numeric(registration_df['عدد أيام الدورة'], errors='coerce').value_counts().sort_index()
+        duration_counts = stats['duration_counts']
         fig = px.bar(
             x=duration_counts.index,
             y=duration_counts.values,
@@ -300,7 +508,7 @@ if sheet_view == "Overview":
         )
         fig.update_traces(text=duration_counts.values, textposition='outside')
         fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CFG, theme=None)
 
 elif sheet_view == "Programs":
     st.header("📋 Programs Analysis")
@@ -308,14 +516,14 @@ elif sheet_view == "Programs":
     # Metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Programs", len(programs_df))
+        st.metric("Total Programs", len(data.programs))
     with col2:
-        st.metric("Total Courses", len(programs_df))
+        st.metric("Total Courses", len(data.programs))
     with col3:
-        total_planned_capacity = len(programs_df) * 17.75
+        total_planned_capacity = len(data.programs) * 17.75
         st.metric("Planned Capacity", int(total_planned_capacity))
     with col4:
-        unique_locations = programs_df['مكان التنفيذ'].nunique()
+        unique_locations = data.programs['مكان التنفيذ'].nunique()
         st.metric("Training Locations", unique_locations)
     
     st.markdown("---")
@@ -323,22 +531,24 @@ elif sheet_view == "Programs":
     # Filters
     col1, col2 = st.columns(2)
     with col1:
+        location_options = unique_vals(data.key, SHEET_NAMES[0], 'مكان التنفيذ', data.programs)
         selected_location = st.multiselect(
             "Filter by Location",
-            options=programs_df['مكان التنفيذ'].unique(),
-            default=programs_df['مكان التنفيذ'].unique()
+            options=location_options,
+            default=location_options
         )
     
     # Filter data
-    filtered_programs = programs_df[
-        programs_df['مكان التنفيذ'].isin(selected_location)
+    filtered_programs = data.programs[
+        data.programs['مكان التنفيذ'].isin(selected_location)
     ]
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📊 Programs by Location")
-        location_dist = filtered_programs['مكان التنفيذ'].value_counts()
+        # Categorical value_counts also lists the filtered-out locations with a count of 0
+        location_dist = filtered_programs['مكان التنفيذ'].value_counts().loc[lambda counts: counts > 0]
         fig = px.bar(
             x=location_dist.index,
             y=location_dist.values,
@@ -372,21 +582,18 @@ elif sheet_view == "Trainees":
     st.header("👥 Trainees Analysis")
     
     # Metrics
+    tr_stats = trainee_stats(data.key, data.trainees)
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
-        st.metric("Total Trainees", len(trainees_df))
+        st.metric("Total Trainees", len(data.trainees))
     with col2:
-        unique_jobs = trainees_df['الوظيفة'].nunique()
-        st.metric("Unique Job Titles", unique_jobs)
+        st.metric("Unique Job Titles", tr_stats['الوظيفة'])
     with col3:
-        unique_qualifications = trainees_df['المؤهل الدراسي'].nunique()
-        st.metric("Education Levels", unique_qualifications)
+        st.metric("Education Levels", tr_stats['المؤهل الدراسي'])
     with col4:
-        unique_workplaces = trainees_df['مكان العمل'].nunique()
-        st.metric("Workplaces", unique_workplaces)
+        st.metric("Workplaces", tr_stats['مكان العمل'])
     with col5:
-        unique_phones = trainees_df['رقم الموبايل'].nunique()
-        st.metric("Unique Contacts", unique_phones)
+        st.metric("Unique Contacts", tr_stats['رقم الموبايل'])
     
     st.markdown("---")
     
@@ -394,7 +601,7 @@ elif sheet_view == "Trainees":
     
     with col1:
         st.subheader("💼 Top Job Positions")
-        job_counts = trainees_df['الوظيفة'].value_counts().head(10)
+        job_counts = top_k_counts(data.trainees['الوظيفة'])
         fig = px.bar(
             x=job_counts.values,
             y=job_counts.index,
@@ -407,7 +614,7 @@ elif sheet_view == "Trainees":
     
     with col2:
         st.subheader("🎓 Qualifications Distribution")
-        qual_counts = trainees_df['المؤهل الدراسي'].value_counts().head(10)
+        qual_counts = top_k_counts(data.trainees['المؤهل الدراسي'])
         fig = px.pie(
             values=qual_counts.values,
             names=qual_counts.index,
@@ -420,7 +627,7 @@ elif sheet_view == "Trainees":
     
     with col1:
         st.subheader("🏢 Top Workplaces")
-        workplace_counts = trainees_df['مكان العمل'].value_counts().head(10)
+        workplace_counts = top_k_counts(data.trainees['مكان العمل'])
         fig = px.bar(
             x=workplace_counts.values,
             y=workplace_counts.index,
@@ -433,54 +640,49 @@ elif sheet_view == "Trainees":
     
     with col2:
         st.subheader("📊 Trainees by Status")
-        st.write(f"Total trainees in database: {len(trainees_df)}")
-        st.write(f"Unique national IDs: {trainees_df['الرقم القومي'].nunique()}")
-        st.write(f"Unique phone numbers: {trainees_df['رقم الموبايل'].nunique()}")
+        st.write(f"Total trainees in database: {len(data.trainees)}")
+        st.write(f"Unique national IDs: {tr_stats['الرقم القومي']}")
+        st.write(f"Unique phone numbers: {tr_stats['رقم الموبايل']}")
     
     # Data table
     st.subheader("📑 Trainee Details")
     display_cols = [' الاسم رباعي باللغة العربية', 'الوظيفة', 'مكان العمل', 'المؤهل الدراسي']
-    st.dataframe(
-        trainees_df[display_cols],
-        use_container_width=True,
-        height=400
-    )
+    show_table(data.trainees[display_cols])
 
 elif sheet_view == "Registrations":
     st.header("📝 Registration Analysis")
     
     # Metrics
+    reg_stats = registration_stats(data.key, data.registration)
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
-        st.metric("Total Registrations", len(registration_df))
+        st.metric("Total Registrations", len(data.registration))
     with col2:
-        avg_attendance = pd.to_numeric(registration_df['Attendance'], errors='coerce').mean()
-        st.metric("Avg Attendance", f"{avg_attendance:.1f}%")
+        st.metric("Avg Attendance", f"{reg_stats['avg_attendance']:.1f}%")
     with col3:
-        avg_duration = pd.to_numeric(registration_df['عدد أيام الدورة'], errors='coerce').mean()
-        st.metric("Avg Course Days", f"{avg_duration:.1f}")
+        st.metric("Avg Course Days", f"{reg_stats['avg_duration']:.1f}")
     with col4:
-        unique_courses = registration_df['البرنامج التدريبي'].nunique()
-        st.metric("Unique Programs", unique_courses)
+        st.metric("Unique Programs", reg_stats['unique_courses'])
     with col5:
-        unique_locations = registration_df['مكان التدريب'].nunique()
-        st.metric("Training Locations", unique_locations)
+        st.metric("Training Locations", reg_stats['unique_locations'])
     
     st.markdown("---")
     
     # Filters
     col1, col2, col3 = st.columns(3)
     with col1:
+        program_options = unique_vals(data.key, SHEET_NAMES[2], 'البرنامج التدريبي', data.registration)
         selected_programs = st.multiselect(
             "Filter by Program",
-            options=registration_df['البرنامج التدريبي'].unique(),
-            default=registration_df['البرنامج التدريبي'].unique()[:5]
+            options=program_options,
+            default=program_options[:5]
         )
     with col2:
+        gov_options = unique_vals(data.key, SHEET_NAMES[2], 'مكان التدريب(محافظة)', data.registration)
         selected_gov = st.multiselect(
             "Filter by Governorate",
-            options=registration_df['مكان التدريب(محافظة)'].dropna().unique(),
-            default=registration_df['مكان التدريب(محافظة)'].dropna().unique()[:5]
+            options=gov_options,
+            default=gov_options[:5]
         )
     with col3:
         attendance_filter = st.slider(
@@ -491,11 +693,13 @@ elif sheet_view == "Registrations":
         )
     
     # Filter data
-    filtered_reg = registration_df[
-        (registration_df['البرنامج التدريبي'].isin(selected_programs)) &
-        (registration_df['مكان التدريب(محافظة)'].isin(selected_gov)) &
-        (pd.to_numeric(registration_df['Attendance'], errors='coerce') >= attendance_filter)
-    ]
+    filtered_reg = filter_reg(
+        data.key,
+        tuple(sorted(selected_programs)),
+        tuple(sorted(selected_gov)),
+        attendance_filter,
+        data.registration
+    )
     
     st.info(f"Showing {len(filtered_reg)} registrations based on filters")
     
@@ -503,11 +707,11 @@ elif sheet_view == "Registrations":
     
     with col1:
         st.subheader("📊 Attendance Distribution")
-        attendance_data = pd.to_numeric(filtered_reg['Attendance'], errors='coerce')
-        fig = px.histogram(
-            x=attendance_data,
+        attendance_data = filtered_reg['Attendance']
+        fig = fast_hist(
+            attendance_data,
             nbins=20,
-            labels={'x': 'Attendance %', 'count': 'Number of Registrations'},
+            labels={'x': 'Attendance %', 'y': 'Number of Registrations'},
             title="Attendance Distribution"
         )
         fig.update_traces(texttemplate='%{y}', textposition='outside')
@@ -515,10 +719,10 @@ elif sheet_view == "Registrations":
     
     with col2:
         st.subheader("📅 Exam Scores (Final)")
-        final_exam = pd.to_numeric(filtered_reg['الامتحان النهائي'], errors='coerce')
+        final_exam = filtered_reg['الامتحان النهائي']
         if final_exam.notna().sum() > 0:
-            fig = px.histogram(
-                x=final_exam,
+            fig = fast_hist(
+                final_exam,
                 nbins=20,
                 labels={'x': 'Final Exam Score', 'y': 'Count'},
                 title="Final Exam Score Distribution"
@@ -530,11 +734,7 @@ elif sheet_view == "Registrations":
     st.subheader("📑 Registration Details")
     display_cols = ['البرنامج التدريبي', 'مكان التدريب(محافظة)', 'Attendance', 'الامتحان المبدئي', 'الامتحان النهائي']
     available_cols = [c for c in display_cols if c in filtered_reg.columns]
-    st.dataframe(
-        filtered_reg[available_cols],
-        use_container_width=True,
-        height=400
-    )
+    show_table(filtered_reg[available_cols])
 
 else:  # Comparative Analysis
     st.header("🔄 Comparative Analysis")
@@ -542,41 +742,27 @@ else:  # Comparative Analysis
     # Overall metrics
     st.subheader("📊 Overall Statistics")
     
+    comp_stats = comparison_stats(data.key, data.programs, data.registration)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Planned Capacity", int(len(programs_df) * 17.75))
+        st.metric("Planned Capacity", int(comp_stats['planned_capacity']))
     
     with col2:
-        st.metric("Actual Registrations", len(registration_df))
+        st.metric("Actual Registrations", len(data.registration))
     
     with col3:
-        capacity = len(programs_df) * 17.75
-        enrollment_rate = (len(registration_df) / capacity * 100) if capacity > 0 else 0
-        st.metric("Enrollment Rate", f"{enrollment_rate:.1f}%")
+        st.metric("Enrollment Rate", f"{comp_stats['enrollment_rate']:.1f}%")
     
     with col4:
-        avg_attendance = pd.to_numeric(registration_df['Attendance'], errors='coerce').mean()
-        st.metric("Avg Attendance", f"{avg_attendance:.1f}%")
+        st.metric("Avg Attendance", f"{comp_stats['avg_attendance']:.1f}%")
     
     st.markdown("---")
     
     # Program comparison
     st.subheader("📚 Program-wise Comparison")
     
-    # Aggregate by program
-    plan_by_program = programs_df.groupby('البرنامج التدريبي').size().reset_index(name='planned_courses')
-    actual_by_program = registration_df.groupby('البرنامج التدريبي').size().reset_index(name='actual_registrations')
-    
-    comparison = plan_by_program.merge(
-        actual_by_program, 
-        on='البرنامج التدريبي', 
-        how='outer'
-    ).fillna(0)
-    
-    comparison['planned_capacity'] = comparison['planned_courses'] * 17.75
-    comparison['fulfillment_rate'] = (comparison['actual_registrations'] / comparison['planned_capacity'] * 100).round(1)
-    comparison = comparison.sort_values('planned_courses', ascending=False).head(15)
+    comparison = comp_stats['comparison']
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -627,7 +813,7 @@ else:  # Comparative Analysis
     
     with col1:
         st.write("**Programs by Training Location**")
-        location_dist = programs_df['مكان التنفيذ'].value_counts().head(10)
+        location_dist = comp_stats['location_dist']
         fig = px.bar(
             x=location_dist.values,
             y=location_dist.index,
@@ -640,7 +826,7 @@ else:  # Comparative Analysis
     
     with col2:
         st.write("**Registrations by Governorate**")
-        gov_dist = registration_df['مكان التدريب(محافظة)'].value_counts().head(10)
+        gov_dist = comp_stats['gov_dist']
         fig = px.bar(
             x=gov_dist.values,
             y=gov_dist.index,
@@ -665,6 +851,9 @@ else:  # Comparative Analysis
         height=400
     )
 
+load_status.success(f"✅ Data loaded successfully!")
+load_status.metric("Last Updated", pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"))
+
 # Footer
 st.markdown("---")
 st.markdown("**📊 Q2 Training Dashboard** | Data Source: second quarter.xlsx")
@@ -4,6 +4,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 import numpy as np
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.uploaded_file_manager import UploadedFile
 
 # Page configuration
 st.set_page_config(
@@ -45,12 +49,225 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+# Rust-backed calamine reader when python-calamine is installed, openpyxl otherwise
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Repeated Arabic text columns hit by groupby/isin/value_counts/merge across the views
+CAT_COLS = ['المحافظة', 'البرنامج التدريبي', 'الإدارة', 'الوظيفة', 'المؤهل الدراسي', 'مكان العمل', 'مكان التدريب']
+
+def _to_categories(df: pd.DataFrame) -> pd.DataFrame:
+    for col in CAT_COLS:
+        if col in df.columns and df[col].nunique() < 0.5 * len(df):
+            # Categories in first-appearance order so value_counts ties rank as they did on plain strings
+            df[col] = df[col].astype(pd.CategoricalDtype(df[col].dropna().unique()))
+    return df
+
+# Numeric trainee columns held as float32: displayed to one decimal, so float64 only doubles the bytes scanned
+FLOAT32_COLS = ['Attendance', 'عدد أيام الدورة']
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    for col in FLOAT32_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    return df
+
+# Attendance of 60% or more counts as a pass
+PASSING_THRESHOLD = 60
+
+def _add_pass_flags(df: pd.DataFrame) -> pd.DataFrame:
+    # Pass/fail flags computed once at load; every view sums these instead of re-comparing Attendance
+    if 'Attendance' in df.columns:
+        df['_passed'] = df['Attendance'].ge(PASSING_THRESHOLD).fillna(False).astype('int8')
+        df['_failed'] = df['Attendance'].lt(PASSING_THRESHOLD).fillna(False).astype('int8')
+    return df
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    # Mixed-type object columns (e.g. Score: "14 / 155" next to plain ints) can't be converted to Arrow
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+# Cache keys for load_data: file identity instead of hashing the whole workbook on every rerun
+def _uploaded_file_key(f: UploadedFile):
+    # getbuffer() slices a memoryview, so only the first 64KB are touched rather than copying the upload
+    return (f.name, f.size, hashlib.sha1(f.getbuffer()[:65536]).hexdigest())
+
+def _path_key(p: Path):
+    st_ = p.stat()
+    return (str(p), st_.st_mtime_ns, st_.st_size)
+
 # Load data
-@st.cache_data
+# hash_funcs matches on the exact type name, so register the concrete PosixPath/WindowsPath class too
+@st.cache_data(hash_funcs={UploadedFile: _uploaded_file_key, Path: _path_key, type(Path()): _path_key})
 def load_data(file_path):
-    plan_df = pd.read_excel(file_path, sheet_name='plan')
-    trainee_df = pd.read_excel(file_path, sheet_name='trainne')
-    return plan_df, trainee_df
+    # One workbook handle for both sheets instead of unzipping it once per read_excel call;
+    # Arrow-backed columns keep the Arabic text columns in columnar buffers for the group-bys
+    with pd.ExcelFile(file_path, engine=EXCEL_ENGINE) as xl:
+        plan_df = _arrow_safe(xl.parse('plan')).convert_dtypes(dtype_backend='pyarrow')
+        trainee_df = _arrow_safe(xl.parse('trainne')).convert_dtypes(dtype_backend='pyarrow')
+    # Load time is formatted once and frozen in the cache entry alongside the frames
+    loaded_at = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+    return _to_categories(plan_df), _add_pass_flags(_downcast(_to_categories(trainee_df))), loaded_at
+
+# Training Plan timeline draws at most this many course bars
+MAX_TIMELINE_BARS = 500
+# Detail tables are sent to the browser one page of this many rows at a time
+MAX_TABLE_ROWS = 500
+
+# Per-group pass counts, rate and mean Attendance in one vectorized groupby over the load-time pass flag
+def _performance_by(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    perf = (
+        df.groupby(key, observed=True)
+        .agg(
+            success_count=('_passed', 'sum'),
+            total_trainees=('_passed', 'size'),
+            avg_score=('Attendance', 'mean'),
+        )
+        .reset_index()
+    )
+    perf['success_rate'] = perf['success_count'] / perf['total_trainees'] * 100
+    return perf.sort_values('success_rate', ascending=True)
+
+def top_k_counts(s, k=10):
+    # Count then select the k largest; avoids sorting every unique value like value_counts().head(k)
+    return s.groupby(s, sort=False, observed=True).size().nlargest(k)
+
+def fast_hist(values, nbins=20, labels=None, title=None):
+    # Bin server-side so only nbins bars are serialized to the browser instead of every value
+    arr = values.to_numpy(dtype='float64', na_value=np.nan)
+    counts, edges = np.histogram(arr[~np.isnan(arr)], bins=nbins)
+    fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, labels=labels, title=title)
+    fig.update_layout(bargap=0)
+    return fig
+
+def fast_isin_mask(col: pd.Series, selected):
+    # isin as an integer compare on categorical codes; None when every category is selected and no row
+    # is blank (categories come from the loaded values, so that means every row matches and no mask is needed)
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        return col.isin(selected).to_numpy()
+    codes = col.cat.codes.to_numpy()
+    wanted = col.cat.categories.get_indexer(list(set(selected)))
+    wanted = wanted[wanted >= 0]
+    if wanted.size == col.cat.categories.size and codes.min(initial=0) >= 0:
+        return None
+    return np.isin(codes, wanted)
+
+def _apply_masks(df: pd.DataFrame, *masks) -> pd.DataFrame:
+    masks = [m for m in masks if m is not None]
+    return df[np.logical_and.reduce(masks)] if masks else df
+
+def show_chart(fig):
+    # Constant uirevision: reruns update the traces in place and keep the user's zoom/legend state
+    fig.update_layout(uirevision='keep')
+    st.plotly_chart(fig, use_container_width=True)
+
+def show_table(df: pd.DataFrame, cols: list, key: str):
+    # Slice of just the displayed columns and the current page, so only that block is serialized to Arrow;
+    # df[cols] raises KeyError for a missing header instead of showing another column under it
+    n_pages = max(1, -(-len(df) // MAX_TABLE_ROWS))
+    # The stored page outlives the filters: clamp it when they shrink the table below that page
+    if st.session_state.get(key, 1) > n_pages:
+        st.session_state[key] = n_pages
+    page = st.number_input("Page", min_value=1, max_value=n_pages, key=key) if n_pages > 1 else 1
+    start = (page - 1) * MAX_TABLE_ROWS
+    st.dataframe(
+        df[cols].iloc[start:start + MAX_TABLE_ROWS],
+        use_container_width=True,
+        height=400
+    )
+    if n_pages > 1:
+        st.caption(f"Rows {start + 1:,}–{min(start + MAX_TABLE_ROWS, len(df)):,} of {len(df):,}")
+
+@st.cache_data
+def build_count_bar(counts: pd.Series, x_label: str, y_label: str, title: str, orientation: str = 'v', height=None) -> dict:
+    # Count bar chart cached as a plain dict keyed on the counts, so unchanged charts skip figure construction
+    x, y = (counts.index, counts.values) if orientation == 'v' else (counts.values, counts.index)
+    fig = px.bar(x=x, y=y, orientation=orientation, labels={'x': x_label, 'y': y_label}, title=title)
+    fig.update_traces(text=counts.values, textposition='outside')
+    if height is not None:
+        fig.update_layout(height=height, showlegend=False)
+    return fig.to_dict()
+
+@st.cache_data
+def unique_vals(data_key: tuple, sheet: str, col: str, _df: pd.DataFrame) -> tuple:
+    # Filter options in first-appearance order, as an immutable tuple for the widget state.
+    # _df is skipped by the hasher; data_key (the same cheap file key load_data uses) identifies the workbook
+    return tuple(_df[col].dropna().unique())
+
+def _sorted_counts(values: pd.Series) -> pd.Series:
+    # One sort-based pass that yields the distinct values already in order, instead of a hash count plus sort_index
+    arr = values.to_numpy(dtype='float64', na_value=np.nan)
+    uniq, counts = np.unique(arr[~np.isnan(arr)], return_counts=True)
+    return pd.Series(counts, index=uniq)
+
+# Cached aggregates: every widget interaction reruns the script, so the per-view
+# aggregations are computed once per filtered dataset instead of once per rerun
+@st.cache_data
+def overview_aggregates(trainee_df: pd.DataFrame, plan_df: pd.DataFrame) -> dict:
+    return {
+        'gov_performance': _performance_by(trainee_df, 'المحافظة'),
+        'program_performance': _performance_by(trainee_df, 'البرنامج التدريبي'),
+        'course_counts': top_k_counts(trainee_df['البرنامج التدريبي']),
+        'dept_counts': plan_df['الإدارة'].value_counts().loc[lambda counts: counts > 0],
+        'gov_counts': trainee_df['المحافظة'].value_counts().loc[lambda counts: counts > 0] if 'المحافظة' in trainee_df.columns else pd.Series(dtype=int),
+        'programs_per_gov': trainee_df.groupby('المحافظة', observed=True)['البرنامج التدريبي'].nunique().sort_values(ascending=False),
+        'duration_counts': _sorted_counts(trainee_df['عدد أيام الدورة']),
+    }
+
+# Shared pool for independent aggregations (pandas' C kernels release the GIL); cache_resource builds it
+# once per server process instead of on every script rerun
+@st.cache_resource
+def _agg_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+
+def _outer_merge(left: pd.DataFrame, right: pd.DataFrame, key: str) -> pd.DataFrame:
+    # Shared categorical key so the join runs on integer codes; only the value columns are filled
+    cats = pd.CategoricalDtype(pd.Index(left[key].astype(object)).union(pd.Index(right[key].astype(object))))
+    merged = left.astype({key: cats}).merge(right.astype({key: cats}), on=key, how='outer', sort=False)
+    value_cols = [c for c in merged.columns if c != key]
+    merged[value_cols] = merged[value_cols].fillna(0)
+    return merged
+
+@st.cache_data
+def comparison_frames(plan_df: pd.DataFrame, trainee_df: pd.DataFrame) -> dict:
+    # The six plan/actual aggregations are independent; run them on the pool and join once all are in
+    has_plan_cols = all(c in plan_df.columns for c in ['البرنامج التدريبي', 'عدد المستهدفين'])
+    pool = _agg_pool()
+    futures = {
+        'plan_by_program': pool.submit(
+            lambda: plan_df.groupby('البرنامج التدريبي', observed=True)['عدد المستهدفين'].sum().reset_index() if has_plan_cols else pd.DataFrame(columns=['البرنامج التدريبي','عدد المستهدفين'])),
+        'actual_by_program': pool.submit(
+            lambda: trainee_df.groupby('البرنامج التدريبي', observed=True).size().reset_index(name='actual_count') if 'البرنامج التدريبي' in trainee_df.columns else pd.DataFrame(columns=['البرنامج التدريبي','actual_count'])),
+        'plan_by_gov': pool.submit(
+            lambda: plan_df.groupby('المحافظة', observed=True)['عدد المستهدفين'].sum().reset_index()),
+        'actual_by_gov': pool.submit(
+            lambda: trainee_df['المحافظة'].value_counts().loc[lambda counts: counts > 0].rename_axis('المحافظة').reset_index(name='actual_count')),
+        'plan_courses_gov': pool.submit(
+            lambda: plan_df['المحافظة'].value_counts().loc[lambda counts: counts > 0].rename_axis('المحافظة').reset_index(name='planned_courses')),
+        'actual_courses_gov': pool.submit(
+            lambda: trainee_df.groupby('المحافظة', observed=True).size().reset_index(name='actual_courses')),
+    }
+    agg = {name: future.result() for name, future in futures.items()}
+    
+    # Plan vs actual by program
+    comparison = _outer_merge(agg['plan_by_program'], agg['actual_by_program'], 'البرنامج التدريبي')
+    
+    comparison['fulfillment_rate'] = (comparison['actual_count'] / comparison['عدد المستهدفين'] * 100).round(1)
+    comparison = comparison.sort_values('عدد المستهدفين', ascending=False).head(15)
+    
+    # Plan vs actual trainees by governorate
+    gov_comparison = _outer_merge(agg['plan_by_gov'], agg['actual_by_gov'], 'المحافظة')
+    gov_comparison = gov_comparison.sort_values('عدد المستهدفين', ascending=False)
+    
+    # Planned courses vs actual trainees by governorate
+    courses_gov_comp = _outer_merge(agg['plan_courses_gov'], agg['actual_courses_gov'], 'المحافظة')
+    courses_gov_comp = courses_gov_comp.sort_values('planned_courses', ascending=False)
+    
+    return {'comparison': comparison, 'gov_comparison': gov_comparison, 'courses_gov_comp': courses_gov_comp}
 
 # Default file path (if the file is bundled with the app repo)
 default_file = (Path(__file__).parent / "second quarter.xlsx")
@@ -78,9 +295,10 @@ try:
     if file_to_use is None:
         st.warning("يرجى رفع ملف Excel يحتوي على sheet بإسم plan و trainne؛ لا يوجد ملف افتراضي على الخادم.")
         st.stop()
-    plan_df, trainee_df = load_data(file_to_use)
+    plan_df, trainee_df, loaded_at = load_data(file_to_use)
+    data_key = _uploaded_file_key(file_to_use) if isinstance(file_to_use, UploadedFile) else _path_key(file_to_use)
     st.sidebar.success("✅ Data loaded successfully!")
-    st.sidebar.metric("Last Updated", pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"))
+    st.sidebar.metric("Last Updated", loaded_at)
     # Helpers to safely access columns after source updates
     def _safe_sum(df: pd.DataFrame, col: str) -> float:
         return float(df[col].sum()) if col in df.columns else 0.0
@@ -172,12 +390,9 @@ with col_logo:
         )
     else:
         st.caption("Add logo.png to assets for header logo")
-    with col2:
-        st.subheader("🎯 Target Participants by Program")
-        if _has(filtered_plan, ['البرنامج التدريبي', 'عدد المستهدفين']):
-            program_targets = filtered_plan.groupby('البرنامج التدريبي')['عدد المستهدفين'].sum().sort_values(ascending=False).head(10)
-        else:
-            program_targets = pd.Series(dtype=float)
+with col_title:
+    st.markdown(
+        """
         <div style="text-align:center; margin-top:0; margin-bottom:0.5rem;">
             <div class="center-title">Health Information Technology and Statistics Training Center</div>
             <div class="center-subtitle">Learn Today, Lead Tomorrow</div>
@@ -196,9 +411,8 @@ if sheet_view == "Overview":
     st.header("📈 Overview Statistics")
     
     # Calculate performance metrics
-    passing_threshold = 60
-    trainees_passed = (trainee_df['Attendance'] >= passing_threshold).sum()
-    trainees_failed = (trainee_df['Attendance'] < passing_threshold).sum()
+    trainees_passed = int(trainee_df['_passed'].sum())
+    trainees_failed = int(trainee_df['_failed'].sum())
     total_trainees = len(trainee_df)
     success_rate = (trainees_passed / total_trainees * 100) if total_trainees > 0 else 0
     failure_rate = (trainees_failed / total_trainees * 100) if total_trainees > 0 else 0
@@ -262,7 +476,7 @@ if sheet_view == "Overview":
                 }
             ))
             fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
         else:
             st.info("لا يوجد مستهدف محدد لعرض المؤشر")
     
@@ -286,7 +500,7 @@ if sheet_view == "Overview":
                 }
             ))
             fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
         else:
             st.info("لا توجد برامج مخططة لعرض المؤشر")
     
@@ -295,21 +509,8 @@ if sheet_view == "Overview":
     # Performance by Governorate and Program - Full Distribution with Detailed Metrics
     st.subheader("📊 أداء المحافظات (Performance by Governorate)")
     
-    gov_performance_full = trainee_df.groupby('المحافظة').apply(
-        lambda x: {
-            'success_count': (x['Attendance'] >= 60).sum(),
-            'fail_count': (x['Attendance'] < 60).sum(),
-            'total': len(x),
-            'success_rate': (x['Attendance'] >= 60).sum() / len(x) * 100,
-            'avg_score': x['Attendance'].mean()
-        }
-    ).reset_index()
-    gov_performance_full.columns = ['المحافظة', 'metrics']
-    gov_performance_full = gov_performance_full.dropna()
-    gov_performance_full['success_rate'] = gov_performance_full['metrics'].apply(lambda x: x['success_rate'])
-    gov_performance_full['total_trainees'] = gov_performance_full['metrics'].apply(lambda x: x['total'])
-    gov_performance_full['avg_score'] = gov_performance_full['metrics'].apply(lambda x: x['avg_score'])
-    gov_performance_full = gov_performance_full.sort_values('success_rate', ascending=True)
+    aggregates = overview_aggregates(trainee_df, plan_df)
+    gov_performance_full = aggregates['gov_performance']
     
     fig = px.bar(
         gov_performance_full,
@@ -324,26 +525,12 @@ if sheet_view == "Overview":
     )
     fig.update_traces(text=gov_performance_full['success_rate'].round(1), textposition='outside')
     fig.update_layout(height=max(400, len(gov_performance_full) * 20), xaxis_title='معدل النجاح (%)')
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     
     # Program performance table with all details
     st.subheader("📚 أداء البرامج التدريبية (Performance by Program)")
     
-    program_performance_full = trainee_df.groupby('البرنامج التدريبي').apply(
-        lambda x: {
-            'success_count': (x['Attendance'] >= 60).sum(),
-            'fail_count': (x['Attendance'] < 60).sum(),
-            'total': len(x),
-            'success_rate': (x['Attendance'] >= 60).sum() / len(x) * 100,
-            'avg_score': x['Attendance'].mean()
-        }
-    ).reset_index()
-    program_performance_full.columns = ['البرنامج التدريبي', 'metrics']
-    program_performance_full = program_performance_full.dropna()
-    program_performance_full['success_rate'] = program_performance_full['metrics'].apply(lambda x: x['success_rate'])
-    program_performance_full['total_trainees'] = program_performance_full['metrics'].apply(lambda x: x['total'])
-    program_performance_full['avg_score'] = program_performance_full['metrics'].apply(lambda x: x['avg_score'])
-    program_performance_full = program_performance_full.sort_values('success_rate', ascending=True)
+    program_performance_full = aggregates['program_performance']
     
     fig = px.bar(
         program_performance_full,
@@ -358,7 +545,7 @@ if sheet_view == "Overview":
     )
     fig.update_traces(text=program_performance_full['success_rate'].round(1), textposition='outside')
     fig.update_layout(height=max(400, len(program_performance_full) * 20), xaxis_title='معدل النجاح (%)')
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     
     st.markdown("---")
     
@@ -367,7 +554,7 @@ if sheet_view == "Overview":
     
     with col1:
         st.subheader("📚 Top Training Programs")
-        course_counts = trainee_df['البرنامج التدريبي'].value_counts().head(10)
+        course_counts = aggregates['course_counts']
         max_value = course_counts.max()
         fig = px.bar(
             x=course_counts.values,
@@ -383,80 +570,57 @@ if sheet_view == "Overview":
             margin=dict(l=20, r=100, t=40, b=20),
             xaxis=dict(range=[0, max_value * 1.15])
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     with col2:
         st.subheader("🏢 Departments Distribution")
-        dept_counts = plan_df['الإدارة'].value_counts()
+        dept_counts = aggregates['dept_counts']
         fig = px.pie(
             values=dept_counts.values,
             names=dept_counts.index,
             title="Training Courses by Department"
         )
         fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     # Full width charts
     col1, col2 = st.columns(2)
     
-    gov_counts_full = trainee_df['المحافظة'].value_counts() if 'المحافظة' in trainee_df.columns else pd.Series(dtype=int)
+    gov_counts_full = aggregates['gov_counts']
     
     with col1:
         st.subheader("📍 عدد المتدربين لكل محافظة - أفضل 10")
         gov_top10 = gov_counts_full.head(10)
-        fig = px.bar(
-            x=gov_top10.index,
-            y=gov_top10.values,
-            labels={'x': 'Governorate', 'y': 'Number of Trainees'},
-            title="Top 10 Governorates by Trainee Count"
-        )
-        fig.update_traces(text=gov_top10.values, textposition='outside')
-        fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = go.Figure(build_count_bar(gov_top10, 'Governorate', 'Number of Trainees', "Top 10 Governorates by Trainee Count", height=400))
+        show_chart(fig)
     
     with col2:
         st.subheader("📍 عدد المتدربين لكل محافظة - أسوأ 10")
-        gov_bottom10 = gov_counts_full.sort_values(ascending=True).head(10)
-        fig = px.bar(
-            x=gov_bottom10.index,
-            y=gov_bottom10.values,
-            labels={'x': 'Governorate', 'y': 'Number of Trainees'},
-            title="Bottom 10 Governorates by Trainee Count"
-        )
-        fig.update_traces(text=gov_bottom10.values, textposition='outside')
-        fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        gov_bottom10 = gov_counts_full.nsmallest(10)
+        fig = go.Figure(build_count_bar(gov_bottom10, 'Governorate', 'Number of Trainees', "Bottom 10 Governorates by Trainee Count", height=400))
+        show_chart(fig)
     
     st.subheader("📦 عدد البرامج التدريبية لكل محافظة")
-    programs_per_gov = trainee_df.groupby('المحافظة')['البرنامج التدريبي'].nunique().sort_values(ascending=False)
+    programs_per_gov = aggregates['programs_per_gov']
     if len(programs_per_gov) > 0:
-        fig = px.bar(
-            x=programs_per_gov.index,
-            y=programs_per_gov.values,
-            labels={'x': 'Governorate', 'y': 'Programs Count'},
-            title="Programs Offered per Governorate"
-        )
-        fig.update_traces(text=programs_per_gov.values, textposition='outside')
-        fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = go.Figure(build_count_bar(programs_per_gov, 'Governorate', 'Programs Count', "Programs Offered per Governorate", height=400))
+        show_chart(fig)
     else:
         st.info("لا توجد بيانات كافية لعدد البرامج لكل محافظة")
     
     st.subheader("📅 Course Duration Distribution")
     duration_series = trainee_df['عدد أيام الدورة'].dropna()
     if len(duration_series) > 0:
-        duration_df = pd.DataFrame({'duration_days': duration_series})
-        duration_counts = duration_series.value_counts().sort_index()
-        fig = px.histogram(
-            duration_df,
-            x='duration_days',
-            nbins=min(15, max(5, duration_counts.shape[0])),
-            labels={'duration_days': 'Course Duration (Days)', 'count': 'Number of Trainees'},
+        duration_counts = aggregates['duration_counts']
+        fig = px.bar(
+            x=duration_counts.index,
+            y=duration_counts.values,
+            labels={'x': 'Course Duration (Days)', 'y': 'Number of Trainees'},
             title="Distribution of Course Durations"
         )
         fig.update_traces(texttemplate='%{y}', textposition='outside')
         fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
         st.caption(
             f"الحد الأدنى: {duration_series.min()} يوم | الوسيط: {duration_series.median()} يوم | الحد الأقصى: {duration_series.max()} يوم"
         )
@@ -490,30 +654,33 @@ elif sheet_view == "Training Plan":
     # Filters
     col1, col2 = st.columns(2)
     with col1:
+        dept_options = unique_vals(data_key, 'plan', 'الإدارة', plan_df)
         selected_dept = st.multiselect(
             "Filter by Department",
-            options=plan_df['الإدارة'].unique(),
-            default=plan_df['الإدارة'].unique()
+            options=dept_options,
+            default=dept_options
         )
     with col2:
+        plan_gov_options = unique_vals(data_key, 'plan', 'المحافظة', plan_df)
         selected_gov = st.multiselect(
             "Filter by Governorate",
-            options=plan_df['المحافظة'].unique(),
-            default=plan_df['المحافظة'].unique()
+            options=plan_gov_options,
+            default=plan_gov_options
         )
     
     # Filter data
-    filtered_plan = plan_df[
-        (plan_df['الإدارة'].isin(selected_dept)) &
-        (plan_df['المحافظة'].isin(selected_gov))
-    ]
+    filtered_plan = _apply_masks(
+        plan_df,
+        fast_isin_mask(plan_df['الإدارة'], selected_dept),
+        fast_isin_mask(plan_df['المحافظة'], selected_gov)
+    )
     
     # Charts with wider space for bars; put targets on the left with more width
     col_target, col_courses = st.columns([3, 2])
 
     with col_target:
         st.subheader("🎯 Target Participants by Program")
-        program_targets = filtered_plan.groupby('البرنامج التدريبي')['عدد المستهدفين'].sum().sort_values(ascending=False).head(10)
+        program_targets = filtered_plan.groupby('البرنامج التدريبي', observed=True)['عدد المستهدفين'].sum().nlargest(10)
         max_target = program_targets.max() if len(program_targets) > 0 else 0
         fig = px.bar(
             x=program_targets.values,
@@ -529,42 +696,54 @@ elif sheet_view == "Training Plan":
             margin=dict(l=20, r=100, t=40, b=20),
             xaxis=dict(range=[0, max_target * 1.15 if max_target else 10])
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     with col_courses:
         st.subheader("📊 Courses by Department")
-        dept_dist = filtered_plan['الإدارة'].value_counts()
-        fig = px.bar(
-            x=dept_dist.index,
-            y=dept_dist.values,
-            labels={'x': 'Department', 'y': 'Number of Courses'},
-            title="Course Distribution by Department"
-        )
-        fig.update_traces(text=dept_dist.values, textposition='outside')
-        st.plotly_chart(fig, use_container_width=True)
+        dept_dist = filtered_plan['الإدارة'].value_counts().loc[lambda counts: counts > 0]
+        fig = go.Figure(build_count_bar(dept_dist, 'Department', 'Number of Courses', "Course Distribution by Department"))
+        show_chart(fig)
     
     # Timeline
     st.subheader("📅 Training Schedule Timeline")
     timeline_data = filtered_plan[['البرنامج التدريبي', 'بداية الدورة', 'نهاية الدورة']].copy()
     timeline_data = timeline_data.dropna()
     
+    # Cap the bars sent to the browser: keep the courses with the largest targets
+    hidden_courses = 0
+    if len(timeline_data) > MAX_TIMELINE_BARS and 'عدد المستهدفين' in filtered_plan.columns:
+        hidden_courses = len(timeline_data) - MAX_TIMELINE_BARS
+        keep = filtered_plan.loc[timeline_data.index, 'عدد المستهدفين'].nlargest(MAX_TIMELINE_BARS).index
+        timeline_data = timeline_data.loc[timeline_data.index.isin(keep)]
+    
     if len(timeline_data) > 0:
-        fig = px.timeline(
-            timeline_data,
-            x_start='بداية الدورة',
-            x_end='نهاية الدورة',
-            y='البرنامج التدريبي',
-            title="Course Timeline"
+        # One horizontal bar trace (base = start, length in ms) instead of px.timeline's per-group traces
+        start = pd.to_datetime(timeline_data['بداية الدورة'])
+        end = pd.to_datetime(timeline_data['نهاية الدورة'])
+        fig = go.Figure(go.Bar(
+            base=start,
+            x=(end - start).dt.total_seconds() * 1000,
+            y=timeline_data['البرنامج التدريبي'],
+            orientation='h',
+            customdata=np.column_stack([start.dt.strftime('%Y-%m-%d'), end.dt.strftime('%Y-%m-%d')]),
+            hovertemplate='%{y}<br>%{customdata[0]} → %{customdata[1]}<extra></extra>'
+        ))
+        fig.update_layout(
+            title="Course Timeline",
+            xaxis_type='date',
+            yaxis_title='البرنامج التدريبي',
+            height=600
         )
-        fig.update_layout(height=600)
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
+        if hidden_courses:
+            st.caption(f"Showing the {MAX_TIMELINE_BARS} courses with the largest targets; {hidden_courses} more are in the table below")
     
     # Data table
     st.subheader("📑 Filtered Course Data")
-    st.dataframe(
-        filtered_plan[['م', 'الإدارة', 'البرنامج التدريبي', 'المحافظة', 'بداية الدورة', 'نهاية الدورة', 'عدد المستهدفين']],
-        use_container_width=True,
-        height=400
+    show_table(
+        filtered_plan,
+        ['م', 'الإدارة', 'البرنامج التدريبي', 'المحافظة', 'بداية الدورة', 'نهاية الدورة', 'عدد المستهدفين'],
+        key='plan_table_page'
     )
 
 elif sheet_view == "Trainee Details":
@@ -592,16 +771,18 @@ elif sheet_view == "Trainee Details":
     # Filters
     col1, col2, col3 = st.columns(3)
     with col1:
+        course_options = unique_vals(data_key, 'trainne', 'البرنامج التدريبي', trainee_df)
         selected_course = st.multiselect(
             "Filter by Course",
-            options=trainee_df['البرنامج التدريبي'].unique(),
-            default=trainee_df['البرنامج التدريبي'].unique()[:5]
+            options=course_options,
+            default=course_options[:5]
         )
     with col2:
+        trainee_gov_options = unique_vals(data_key, 'trainne', 'المحافظة', trainee_df)
         selected_gov_trainee = st.multiselect(
             "Filter by Governorate",
-            options=trainee_df['المحافظة'].dropna().unique(),
-            default=trainee_df['المحافظة'].dropna().unique()[:5]
+            options=trainee_gov_options,
+            default=trainee_gov_options[:5]
         )
     with col3:
         attendance_filter = st.slider(
@@ -612,11 +793,12 @@ elif sheet_view == "Trainee Details":
         )
     
     # Filter data
-    filtered_trainee = trainee_df[
-        (trainee_df['البرنامج التدريبي'].isin(selected_course)) &
-        (trainee_df['المحافظة'].isin(selected_gov_trainee)) &
-        (trainee_df['Attendance'] >= attendance_filter)
-    ]
+    filtered_trainee = _apply_masks(
+        trainee_df,
+        fast_isin_mask(trainee_df['البرنامج التدريبي'], selected_course),
+        fast_isin_mask(trainee_df['المحافظة'], selected_gov_trainee),
+        trainee_df['Attendance'].ge(attendance_filter).fillna(False).to_numpy(dtype=bool)
+    )
     
     st.info(f"Showing {len(filtered_trainee)} trainees based on filters")
     
@@ -624,52 +806,37 @@ elif sheet_view == "Trainee Details":
     
     with col1:
         st.subheader("📊 Attendance Distribution")
-        fig = px.histogram(
-            filtered_trainee,
-            x='Attendance',
+        fig = fast_hist(
+            filtered_trainee['Attendance'],
             nbins=20,
-            labels={'Attendance': 'Attendance %', 'count': 'Number of Trainees'},
+            labels={'x': 'Attendance %', 'y': 'Number of Trainees'},
             title="Trainee Attendance Distribution"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     with col2:
         st.subheader("🎓 Qualifications Distribution")
-        qual_counts = filtered_trainee['المؤهل الدراسي'].value_counts().head(10)
+        qual_counts = top_k_counts(filtered_trainee['المؤهل الدراسي'])
         fig = px.pie(
             values=qual_counts.values,
             names=qual_counts.index,
             title="Trainees by Educational Qualification"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("💼 Top Job Positions")
-        job_counts = filtered_trainee['الوظيفة'].value_counts().head(10)
-        fig = px.bar(
-            x=job_counts.values,
-            y=job_counts.index,
-            orientation='h',
-            labels={'x': 'Number of Trainees', 'y': 'Job Position'},
-            title="Top 10 Job Positions"
-        )
-        fig.update_traces(text=job_counts.values, textposition='outside')
-        st.plotly_chart(fig, use_container_width=True)
+        job_counts = top_k_counts(filtered_trainee['الوظيفة'])
+        fig = go.Figure(build_count_bar(job_counts, 'Number of Trainees', 'Job Position', "Top 10 Job Positions", orientation='h'))
+        show_chart(fig)
     
     with col2:
         st.subheader("🏢 Top Workplaces")
-        workplace_counts = filtered_trainee['مكان العمل'].value_counts().head(10)
-        fig = px.bar(
-            x=workplace_counts.values,
-            y=workplace_counts.index,
-            orientation='h',
-            labels={'x': 'Number of Trainees', 'y': 'Workplace'},
-            title="Top 10 Workplaces"
-        )
-        fig.update_traces(text=workplace_counts.values, textposition='outside')
-        st.plotly_chart(fig, use_container_width=True)
+        workplace_counts = top_k_counts(filtered_trainee['مكان العمل'])
+        fig = go.Figure(build_count_bar(workplace_counts, 'Number of Trainees', 'Workplace', "Top 10 Workplaces", orientation='h'))
+        show_chart(fig)
     
     # Exam scores analysis (if available)
     st.subheader("📝 Exam Performance")
@@ -679,21 +846,20 @@ elif sheet_view == "Trainee Details":
         # Normalize possible percent strings like "72.3%" and 0-1 scaled values
         def _to_number_percent_aware(series: pd.Series) -> pd.Series:
             if series is None:
-                return pd.Series(dtype='float64')
-            s = series.astype(str).str.strip()
-            # Remove percent sign and normalize decimal separator
-            s = s.str.replace('%', '', regex=False).str.replace(',', '.', regex=False)
-            nums = pd.to_numeric(s, errors='coerce')
+                return pd.Series(dtype='float32')
+            # Arrow string kernels: trim + drop the percent sign in one regex, then normalize the decimal separator
+            s = series.astype('string[pyarrow]').str.replace(r'^\s+|\s+$|%', '', regex=True).str.replace(',', '.', regex=False)
+            nums = pd.to_numeric(s, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
             # If most values look between 0 and 1, scale to 0-100
-            non_na = nums.dropna()
-            if len(non_na) > 0 and (non_na.between(0, 1).mean() > 0.8):
-                nums = nums * 100
-            return nums
+            valid = np.count_nonzero(~np.isnan(nums))
+            if valid > 0 and np.count_nonzero((nums >= 0) & (nums <= 1)) / valid > 0.8:
+                nums *= 100
+            return pd.Series(nums.astype('float32'), index=series.index, name=series.name)
         # Initial exam (always percent-like)
         trainee_df['الامتحان المبدئي_numeric'] = _to_number_percent_aware(trainee_df.get('الامتحان المبدئي'))
         # Final exam may be in 'Score' or 'الامتحان النهائي' — choose the one with data
-        score_series = _to_number_percent_aware(trainee_df['Score']) if 'Score' in trainee_df.columns else pd.Series(dtype='float64')
-        alt_final_series = _to_number_percent_aware(trainee_df['الامتحان النهائي']) if 'الامتحان النهائي' in trainee_df.columns else pd.Series(dtype='float64')
+        score_series = _to_number_percent_aware(trainee_df['Score']) if 'Score' in trainee_df.columns else pd.Series(dtype='float32')
+        alt_final_series = _to_number_percent_aware(trainee_df['الامتحان النهائي']) if 'الامتحان النهائي' in trainee_df.columns else pd.Series(dtype='float32')
         score_non_na = score_series.notna().sum() if not score_series.empty else 0
         alt_non_na = alt_final_series.notna().sum() if not alt_final_series.empty else 0
         threshold = max(5, int(0.05 * len(trainee_df))) if len(trainee_df) > 0 else 0
@@ -707,20 +873,14 @@ elif sheet_view == "Trainee Details":
             trainee_df['final_exam_numeric'] = pd.Series([None] * len(trainee_df))
             final_source_used = 'غير متاح'
         
-        # Calculate success rate by program (60 is passing), over valid rows only
-        def _success_rates(g: pd.DataFrame):
-            init_valid = g['الامتحان المبدئي_numeric'].notna().sum()
-            final_valid = g['final_exam_numeric'].notna().sum()
-            init_rate = ((g['الامتحان المبدئي_numeric'] >= 60).sum() / init_valid * 100) if init_valid > 0 else 0
-            final_rate = ((g['final_exam_numeric'] >= 60).sum() / final_valid * 100) if final_valid > 0 else 0
-            return pd.Series({'initial_success_rate': init_rate, 'final_success_rate': final_rate})
-
-        program_exam_data = trainee_df.groupby('البرنامج التدريبي').apply(_success_rates).reset_index()
-        
-        program_exam_data.columns = ['البرنامج التدريبي', 'metrics']
-        program_exam_data['initial_success_rate'] = program_exam_data['metrics'].apply(lambda x: x['initial_success_rate'])
-        program_exam_data['final_success_rate'] = program_exam_data['metrics'].apply(lambda x: x['final_success_rate'])
-        program_exam_data = program_exam_data.drop('metrics', axis=1)
+        # Calculate success rate by program (60 is passing), over valid rows only;
+        # programs with no valid scores get 0 (0 passed / 0 valid fills to 0)
+        exam_scores = trainee_df[['الامتحان المبدئي_numeric', 'final_exam_numeric']].astype(float)
+        exam_scores.columns = ['initial_success_rate', 'final_success_rate']
+        by_program = trainee_df['البرنامج التدريبي']
+        passed = exam_scores.ge(60).groupby(by_program, observed=True).sum()
+        valid = exam_scores.notna().groupby(by_program, observed=True).sum()
+        program_exam_data = (passed / valid * 100).fillna(0).reset_index()
         program_exam_data = program_exam_data.sort_values('final_success_rate', ascending=False)
         
         if len(program_exam_data) > 0 and (
@@ -758,31 +918,29 @@ elif sheet_view == "Trainee Details":
                 xaxis_tickangle=-45,
                 hovermode='x unified'
             )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
         
         col1, col2 = st.columns(2)
         
         with col1:
             if trainee_df['الامتحان المبدئي_numeric'].notna().sum() > 0:
-                fig = px.histogram(
-                    trainee_df.dropna(subset=['الامتحان المبدئي_numeric']),
-                    x='الامتحان المبدئي_numeric',
+                fig = fast_hist(
+                    trainee_df['الامتحان المبدئي_numeric'],
                     nbins=20,
-                    labels={'الامتحان المبدئي_numeric': 'Initial Exam (%)'},
+                    labels={'x': 'Initial Exam (%)', 'y': 'count'},
                     title="Initial Exam % Distribution"
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                show_chart(fig)
         
         with col2:
             if trainee_df['final_exam_numeric'].notna().sum() > 0:
-                fig = px.histogram(
-                    trainee_df.dropna(subset=['final_exam_numeric']),
-                    x='final_exam_numeric',
+                fig = fast_hist(
+                    trainee_df['final_exam_numeric'],
                     nbins=20,
-                    labels={'final_exam_numeric': 'Final Exam (Score)'},
+                    labels={'x': 'Final Exam (Score)', 'y': 'count'},
                     title="Final Exam Score Distribution"
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                show_chart(fig)
     except:
         st.info("Exam scores are not in numeric format for analysis")
     
@@ -790,11 +948,7 @@ elif sheet_view == "Trainee Details":
     st.subheader("📑 Filtered Trainee Data")
     display_cols = [' الاسم رباعي باللغة العربية', 'البرنامج التدريبي', 'المحافظة', 
                    'الوظيفة', 'المؤهل الدراسي', 'Attendance', 'عدد أيام الدورة']
-    st.dataframe(
-        filtered_trainee[display_cols],
-        use_container_width=True,
-        height=400
-    )
+    show_table(filtered_trainee, display_cols, key='trainee_table_page')
 
 else:  # Comparative Analysis
     st.header("🔄 Comparative Analysis")
@@ -819,17 +973,8 @@ else:  # Comparative Analysis
     st.subheader("📚 Program-wise Comparison")
     
     # Aggregate by program
-    plan_by_program = plan_df.groupby('البرنامج التدريبي')['عدد المستهدفين'].sum().reset_index() if _has(plan_df, ['البرنامج التدريبي', 'عدد المستهدفين']) else pd.DataFrame(columns=['البرنامج التدريبي','عدد المستهدفين'])
-    actual_by_program = trainee_df.groupby('البرنامج التدريبي').size().reset_index(name='actual_count') if 'البرنامج التدريبي' in trainee_df.columns else pd.DataFrame(columns=['البرنامج التدريبي','actual_count'])
-    
-    comparison = plan_by_program.merge(
-        actual_by_program, 
-        on='البرنامج التدريبي', 
-        how='outer'
-    ).fillna(0)
-    
-    comparison['fulfillment_rate'] = (comparison['actual_count'] / comparison['عدد المستهدفين'] * 100).round(1)
-    comparison = comparison.sort_values('عدد المستهدفين', ascending=False).head(15)
+    comp_frames = comparison_frames(plan_df, trainee_df)
+    comparison = comp_frames['comparison']
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -856,7 +1001,7 @@ else:  # Comparative Analysis
         barmode='group',
         height=500
     )
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     
     # Fulfillment rate
     st.subheader("✅ Fulfillment Rate by Program")
@@ -871,29 +1016,19 @@ else:  # Comparative Analysis
     )
     fig.update_traces(text=comparison['fulfillment_rate'], textposition='outside')
     fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
     
     # Governorate comparison - Plan vs Actual
     st.subheader("📍 Planned vs Actual by Governorate")
     
     # Prepare data for governorate comparison
-    plan_by_gov = plan_df.groupby('المحافظة')['عدد المستهدفين'].sum().reset_index()
-    actual_by_gov = trainee_df['المحافظة'].value_counts().reset_index()
-    actual_by_gov.columns = ['المحافظة', 'actual_count']
-    
-    gov_comparison = plan_by_gov.merge(actual_by_gov, on='المحافظة', how='outer').fillna(0)
-    gov_comparison = gov_comparison.sort_values('عدد المستهدفين', ascending=False)
+    gov_comparison = comp_frames['gov_comparison']
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("**عدد الدورات / محافظة** (Number of Courses / Governorate)")
-        plan_courses_gov = plan_df['المحافظة'].value_counts().reset_index()
-        plan_courses_gov.columns = ['المحافظة', 'planned_courses']
-        actual_courses_gov = trainee_df.groupby('المحافظة').size().reset_index(name='actual_courses')
-        
-        courses_gov_comp = plan_courses_gov.merge(actual_courses_gov, on='المحافظة', how='outer').fillna(0)
-        courses_gov_comp = courses_gov_comp.sort_values('planned_courses', ascending=False)
+        courses_gov_comp = comp_frames['courses_gov_comp']
         
         fig = go.Figure()
         fig.add_trace(go.Bar(
@@ -919,7 +1054,7 @@ else:  # Comparative Analysis
             yaxis_title='عدد الدورات',
             height=500
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     with col2:
         st.write("**عدد المتدربين / محافظة** (Number of Trainees / Governorate)")
@@ -947,7 +1082,7 @@ else:  # Comparative Analysis
             yaxis_title='عدد المتدربين',
             height=500
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     # Comparison table
     st.subheader("📋 Detailed Comparison Table")
@@ -1,56 +1,256 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import datetime as dt
+import hashlib
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from fpdf import FPDF
 from fpdf.enums import XPos, YPos
 import arabic_reshaper
+# The pure-Python UAX-9 implementation: python-bidi's Rust get_display (bidi.get_display, >= 0.5) does not
+# mirror brackets, so "مركز (المعلومات)" would come out with reversed parentheses. shape() memoizes the calls.
 from bidi.algorithm import get_display
 
 FILE_PATH = Path(r"c:\Q2\second quarter.xlsx")
 OUTPUT_HTML = Path(r"c:\Q2\report.html")
 OUTPUT_PDF = Path(r"c:\Q2\report.pdf")
 
-
-def load_data(file_path: Path):
-    programs_df = pd.read_excel(file_path, sheet_name='برامج الربع الثانى')
-    trainees_df = pd.read_excel(file_path, sheet_name='بيانات المتدربين')
-    registration_df = pd.read_excel(file_path, sheet_name='تسجيل المتدربين')
-    return programs_df, trainees_df, registration_df
+# Rust-backed calamine reader when python-calamine is installed; otherwise openpyxl in
+# read-only mode, which streams cell values without building styles or external links
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+    EXCEL_ENGINE_KWARGS = {}
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+    EXCEL_ENGINE_KWARGS = {'read_only': True, 'data_only': True, 'keep_links': False}
+
+
+SHEETS = ['برامج الربع الثانى', 'بيانات المتدربين', 'تسجيل المتدربين']
+
+# Columns the report reads from each sheet (None: every column). The trainees sheet is only counted,
+# and is read whole so that rows with a blank cell in any one column still count.
+USECOLS = {
+    'برامج الربع الثانى': {'البرنامج التدريبي', 'مكان التنفيذ'},
+    'بيانات المتدربين': None,
+    'تسجيل المتدربين': {'البرنامج التدريبي', 'مكان التدريب(محافظة)', 'عدد أيام الدورة', 'Attendance'},
+}
+# Listed columns a sheet may lack without forcing a full read
+OPTIONAL_COLS = {'Attendance'}
+
+
+# High-duplication text columns held as categoricals and numeric columns downcast right after loading
+CATEGORICAL_COLS = {
+    'برامج الربع الثانى': ['البرنامج التدريبي', 'مكان التنفيذ'],
+    'تسجيل المتدربين': ['البرنامج التدريبي', 'مكان التدريب(محافظة)'],
+}
+NUMERIC_COLS = {
+    'تسجيل المتدربين': ['Attendance', 'عدد أيام الدورة'],
+}
+
+
+def prepare_sheet(df: pd.DataFrame, sheet: str) -> pd.DataFrame:
+    for col in CATEGORICAL_COLS.get(sheet, []):
+        if col in df.columns:
+            # Categories in first-appearance order so value_counts ties rank as they did on plain strings
+            df[col] = df[col].astype(pd.CategoricalDtype(df[col].dropna().unique()))
+    for col in NUMERIC_COLS.get(sheet, []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    return df
+
+
+def arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    # Mixed-type object columns (e.g. Score: "14 / 155" next to plain ints) can't be written to Parquet
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+# Bump whenever compute_summaries or ReportArrays changes what the summaries hold
+SUMMARIES_VERSION = 1
+
+
+def cache_dir_for(file_path: Path) -> Path:
+    # Derived data lives under .cache/<mtime>-<size>-<columns>/ next to the workbook
+    stat = file_path.stat()
+    columns_key = hashlib.blake2b(repr(sorted((k, sorted(v) if v else None) for k, v in USECOLS.items())).encode(), digest_size=4).hexdigest()
+    return file_path.parent / '.cache' / f"{stat.st_mtime_ns}-{stat.st_size}-{columns_key}"
+
+
+def read_sheet(xf: pd.ExcelFile, sheet: str) -> pd.DataFrame:
+    wanted = USECOLS[sheet]
+    if wanted is None:
+        return pd.read_excel(xf, sheet_name=sheet)
+    # Unused columns are skipped at parse time; a callable tolerates optional columns such as Attendance
+    df = pd.read_excel(xf, sheet_name=sheet, usecols=lambda c: c in wanted)
+    if wanted - OPTIONAL_COLS <= set(df.columns):
+        return df
+    # A renamed or missing header: read every column so the report fails or degrades as it would unfiltered
+    return pd.read_excel(xf, sheet_name=sheet)
 
 
-def safe_mean(series):
+def load_data(file_path: Path):
+    # Parsed sheets are cached as Parquet so reruns on an unchanged file skip the Excel parser entirely
+    cache_dir = cache_dir_for(file_path)
+    parquet_paths = [cache_dir / f"{sheet}.parquet" for sheet in SHEETS]
+    if all(p.exists() for p in parquet_paths):
+        programs_df, trainees_df, registration_df = (
+            prepare_sheet(pd.read_parquet(p, engine='pyarrow'), sheet) for p, sheet in zip(parquet_paths, SHEETS)
+        )
+        return programs_df, trainees_df, registration_df
+
+    # One open of the workbook for all three sheets: the zip and shared-strings table are read once
+    with pd.ExcelFile(file_path, engine=EXCEL_ENGINE, engine_kwargs=EXCEL_ENGINE_KWARGS) as xf:
+        dfs = {sheet: read_sheet(xf, sheet) for sheet in SHEETS}
+    programs_df, trainees_df, registration_df = (prepare_sheet(arrow_safe(dfs[sheet]), sheet) for sheet in SHEETS)
     try:
-        return float(pd.to_numeric(series, errors='coerce').mean())
-    except Exception:
-        return float('nan')
-
-
-def build_report(programs_df: pd.DataFrame, trainees_df: pd.DataFrame, registration_df: pd.DataFrame) -> str:
-    total_courses = len(programs_df)
-    total_trainees = len(trainees_df)
-    total_registrations = len(registration_df)
-    avg_attendance = safe_mean(registration_df.get('Attendance', pd.Series(dtype=float)))
-    enrollment_rate = (total_registrations / (total_courses * 17.75) * 100) if total_courses > 0 else 0
-
-    # Top programs and locations
-    top_programs = registration_df['البرنامج التدريبي'].value_counts().head(10)
-    location_counts = programs_df['مكان التنفيذ'].value_counts()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for df, path in zip((programs_df, trainees_df, registration_df), parquet_paths):
+            tmp_path = path.with_suffix('.tmp')
+            df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+            tmp_path.replace(path)
+    except OSError:
+        pass  # Read-only location: the report is still built from the parsed frames
+    return programs_df, trainees_df, registration_df
 
-    # Governorate and durations
-    gov_counts = registration_df['مكان التدريب(محافظة)'].value_counts().head(10)
-    duration_counts = pd.to_numeric(registration_df['عدد أيام الدورة'], errors='coerce').value_counts().sort_index()
 
-    # Program-wise comparison
-    plan_by_program = programs_df.groupby('البرنامج التدريبي').size().reset_index(name='planned_courses')
-    actual_by_program = registration_df.groupby('البرنامج التدريبي').size().reset_index(name='actual_registrations')
-    comparison = plan_by_program.merge(actual_by_program, on='البرنامج التدريبي', how='outer').fillna(0)
-    comparison['fulfillment_rate'] = (comparison['actual_registrations'] / (comparison['planned_courses'] * 17.75) * 100).fillna(0).round(1)
+def numeric_array(series: pd.Series) -> np.ndarray:
+    # Columns prepared at load are already numeric; only text columns need the coercing fallback
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    return series.to_numpy(dtype='float32', na_value=np.nan)
+
+
+def codes_of(series: pd.Series) -> tuple:
+    # Integer codes plus the distinct values in first-appearance order, so ties rank as value_counts did
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    codes, uniques = pd.factorize(series)
+    return codes, pd.Index(uniques)
+
+
+@dataclass
+class ReportArrays:
+    # The handful of columns the summaries read, narrowed once to contiguous NumPy buffers
+    plan_program_codes: np.ndarray
+    plan_programs: pd.Index
+    location_codes: np.ndarray
+    locations: pd.Index
+    program_codes: np.ndarray
+    programs: pd.Index
+    gov_codes: np.ndarray
+    governorates: pd.Index
+    days: np.ndarray
+    attendance: np.ndarray
+    n_trainees: int
+
+    @classmethod
+    def from_frames(cls, programs_df: pd.DataFrame, trainees_df: pd.DataFrame, registration_df: pd.DataFrame):
+        plan_program_codes, plan_programs = codes_of(programs_df['البرنامج التدريبي'])
+        location_codes, locations = codes_of(programs_df['مكان التنفيذ'])
+        program_codes, programs = codes_of(registration_df['البرنامج التدريبي'])
+        gov_codes, governorates = codes_of(registration_df['مكان التدريب(محافظة)'])
+        return cls(
+            plan_program_codes, plan_programs,
+            location_codes, locations,
+            program_codes, programs,
+            gov_codes, governorates,
+            days=numeric_array(registration_df['عدد أيام الدورة']),
+            attendance=numeric_array(registration_df.get('Attendance', pd.Series(dtype=float))),
+            n_trainees=len(trainees_df),
+        )
+
+
+def bincounts(codes: np.ndarray, names: pd.Index) -> np.ndarray:
+    return np.bincount(codes[codes >= 0], minlength=len(names))
+
+
+def ranked(counts: np.ndarray, names: pd.Index, k=None) -> pd.Series:
+    # Descending counts; the stable sort keeps first-appearance order among ties, like nlargest/value_counts
+    order = np.argsort(-counts, kind='stable')[:k]
+    return pd.Series(counts[order], index=names[order])
+
+
+def nan_mean(values: np.ndarray) -> float:
+    valid = values[~np.isnan(values)]
+    return float(valid.mean(dtype='float64')) if valid.size else float('nan')
+
+
+def sorted_counts(values: np.ndarray) -> pd.Series:
+    # One sort-based NumPy pass; the distinct values come back in order
+    uniq, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+    return pd.Series(counts, index=uniq)
+
+
+def compute_summaries(arrays: ReportArrays) -> dict:
+    # Every aggregation the HTML and PDF reports share, computed once per run
+    total_courses = len(arrays.plan_program_codes)
+    total_registrations = len(arrays.program_codes)
+
+    program_counts = bincounts(arrays.program_codes, arrays.programs)
+
+    # Program-wise comparison: both count arrays aligned on the sorted union of program names
+    plan_by_program = pd.Series(bincounts(arrays.plan_program_codes, arrays.plan_programs), index=arrays.plan_programs)
+    programs = arrays.plan_programs.union(arrays.programs)
+    planned = plan_by_program.reindex(programs, fill_value=0).to_numpy()
+    actual = pd.Series(program_counts, index=arrays.programs).reindex(programs, fill_value=0).to_numpy()
+    # Programs missing from the plan keep an inf rate, as the plain division gave
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = actual / (planned * 17.75) * 100
+    comparison = pd.DataFrame({
+        'البرنامج التدريبي': programs,
+        'planned_courses': planned,
+        'actual_registrations': actual,
+        'fulfillment_rate': np.where(np.isnan(rate), 0, rate).round(1),
+    })
     comparison = comparison.sort_values('planned_courses', ascending=False)
 
+    return {
+        'total_courses': total_courses,
+        'total_trainees': arrays.n_trainees,
+        'total_registrations': total_registrations,
+        'avg_attendance': nan_mean(arrays.attendance),
+        'enrollment_rate': (total_registrations / (total_courses * 17.75) * 100) if total_courses > 0 else 0,
+        # Top programs and locations
+        'top_programs': ranked(program_counts, arrays.programs, 10),
+        'location_counts': ranked(bincounts(arrays.location_codes, arrays.locations), arrays.locations),
+        # Governorate and durations
+        'gov_counts': ranked(bincounts(arrays.gov_codes, arrays.governorates), arrays.governorates, 10),
+        'duration_counts': sorted_counts(arrays.days),
+        'comparison': comparison,
+    }
+
+
+# Count sections shared by the HTML and PDF reports: (summaries key, title, name header, count header, PDF suffix)
+COUNT_SECTIONS = [
+    ('top_programs', 'Top Training Programs', 'Program', 'Registrations', ''),
+    ('location_counts', 'Training Locations Distribution', 'Location', 'Courses', ' courses'),
+    ('gov_counts', 'Top Governorates (Registrations)', 'Governorate', 'Registrations', ''),
+]
+
+
+def count_rows(counts: pd.Series):
+    # Table rows straight from the index/value lists, without a per-row Series.items() lookup
+    return (f'<tr><td>{name}</td><td>{int(count)}</td></tr>' for name, count in zip(counts.index.tolist(), counts.tolist()))
+
+
+def iter_report(summaries: dict):
+    # HTML report as a stream of lines, so it can be written out without building the whole page in memory
+    total_courses = summaries['total_courses']
+    total_trainees = summaries['total_trainees']
+    total_registrations = summaries['total_registrations']
+    enrollment_rate = summaries['enrollment_rate']
+    duration_counts = summaries['duration_counts']
+    comparison = summaries['comparison']
+
     generated_at = dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     # Basic HTML report
-    html = [
+    yield from [
         '<!DOCTYPE html>',
         '<html lang="en">',
         '<head>',
@@ -78,66 +278,60 @@ def build_report(programs_df: pd.DataFrame, trainees_df: pd.DataFrame, registrat
         f'<div class="card"><div>Total Registrations</div><h2>{total_registrations}</h2></div>',
         f'<div class="card"><div>Enrollment Rate</div><h2>{enrollment_rate:.1f}%</h2></div>',
         '</div>',
-        '<div class="section">',
-        '<h2>Top Training Programs</h2>',
-        '<table><thead><tr><th>Program</th><th>Registrations</th></tr></thead><tbody>',
     ]
-    for name, count in top_programs.items():
-        html.append(f'<tr><td>{name}</td><td>{int(count)}</td></tr>')
-    html.extend(['</tbody></table>', '</div>'])
-
-    # Training Locations
-    html.extend(['<div class="section">', '<h2>Training Locations Distribution</h2>', '<table><thead><tr><th>Location</th><th>Courses</th></tr></thead><tbody>'])
-    for name, count in location_counts.items():
-        html.append(f'<tr><td>{name}</td><td>{int(count)}</td></tr>')
-    html.extend(['</tbody></table>', '</div>'])
-
-    # Governorates
-    html.extend(['<div class="section">', '<h2>Top Governorates (Registrations)</h2>', '<table><thead><tr><th>Governorate</th><th>Registrations</th></tr></thead><tbody>'])
-    for name, count in gov_counts.items():
-        html.append(f'<tr><td>{name}</td><td>{int(count)}</td></tr>')
-    html.extend(['</tbody></table>', '</div>'])
+
+    # Top programs, training locations, governorates
+    for key, title, name_header, count_header, _ in COUNT_SECTIONS:
+        yield from ['<div class="section">', f'<h2>{title}</h2>', f'<table><thead><tr><th>{name_header}</th><th>{count_header}</th></tr></thead><tbody>']
+        yield from count_rows(summaries[key])
+        yield from ['</tbody></table>', '</div>']
 
     # Durations
-    html.extend(['<div class="section">', '<h2>Course Duration Distribution (Days)</h2>', '<table><thead><tr><th>Days</th><th>Registrations</th></tr></thead><tbody>'])
-    for days, count in duration_counts.items():
-        html.append(f'<tr><td>{int(days) if pd.notna(days) else ""}</td><td>{int(count)}</td></tr>')
-    html.extend(['</tbody></table>', '</div>'])
+    yield from ['<div class="section">', '<h2>Course Duration Distribution (Days)</h2>', '<table><thead><tr><th>Days</th><th>Registrations</th></tr></thead><tbody>']
+    yield from (
+        f'<tr><td>{int(days) if pd.notna(days) else ""}</td><td>{int(count)}</td></tr>'
+        for days, count in zip(duration_counts.index.tolist(), duration_counts.tolist())
+    )
+    yield from ['</tbody></table>', '</div>']
 
     # Comparison
-    html.extend(['<div class="section">', '<h2>Program-wise Planned vs Actual Registrations</h2>', '<table><thead><tr><th>Program</th><th>Planned Courses</th><th>Registrations</th><th>Fulfillment %</th></tr></thead><tbody>'])
-    for _, row in comparison.iterrows():
-        prog = row['البرنامج التدريبي']
-        planned = int(row['planned_courses'])
-        actual = int(row['actual_registrations'])
-        rate = float(row['fulfillment_rate'])
-        html.append(f'<tr><td>{prog}</td><td>{planned}</td><td>{actual}</td><td>{rate:.1f}</td></tr>')
-    html.extend(['</tbody></table>', '</div>'])
-
-    html.extend(['<hr/>', '<div class="muted">Data Source: second quarter.xlsx</div>', '</body>', '</html>'])
-    return "\n".join(html)
-
-
-def build_pdf(programs_df: pd.DataFrame, trainees_df: pd.DataFrame, registration_df: pd.DataFrame):
-    def shape(text: str) -> str:
-        try:
-            if not isinstance(text, str):
-                text = str(text)
-            reshaped = arabic_reshaper.reshape(text)
-            return get_display(reshaped)
-        except Exception:
-            return str(text)
-
-    total_courses = len(programs_df)
-    total_trainees = len(trainees_df)
-    total_registrations = len(registration_df)
-    avg_attendance = safe_mean(registration_df.get('Attendance', pd.Series(dtype=float)))
-    enrollment_rate = (total_registrations / (total_courses * 17.75) * 100) if total_courses > 0 else 0
-
-    # Prepare summaries
-    top_programs = registration_df['البرنامج التدريبي'].value_counts().head(10)
-    location_counts = programs_df['مكان التنفيذ'].value_counts()
-    gov_counts = registration_df['مكان التدريب(محافظة)'].value_counts().head(10)
+    yield from ['<div class="section">', '<h2>Program-wise Planned vs Actual Registrations</h2>']
+    yield comparison.rename(columns={
+        'البرنامج التدريبي': 'Program',
+        'planned_courses': 'Planned Courses',
+        'actual_registrations': 'Registrations',
+        'fulfillment_rate': 'Fulfillment %',
+    }).to_html(index=False, border=0, float_format='%.1f', justify='left')
+    yield '</div>'
+
+    yield from ['<hr/>', '<div class="muted">Data Source: second quarter.xlsx</div>', '</body>', '</html>']
+
+
+def write_report(path: Path, summaries: dict):
+    with path.open('w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(line + '\n' for line in iter_report(summaries))
+
+
+@lru_cache(maxsize=None)
+def shape(text: str) -> str:
+    # Reshaping and BiDi reordering are pure Python, so each distinct string is processed once
+    try:
+        if not isinstance(text, str):
+            text = str(text)
+        if text.isascii():
+            return text  # No Arabic to join or reorder
+        reshaped = arabic_reshaper.reshape(text)
+        return get_display(reshaped)
+    except Exception:
+        return str(text)
+
+
+def build_pdf(summaries: dict):
+    total_courses = summaries['total_courses']
+    total_trainees = summaries['total_trainees']
+    total_registrations = summaries['total_registrations']
+    avg_attendance = summaries['avg_attendance']
+    enrollment_rate = summaries['enrollment_rate']
 
     pdf = FPDF(orientation='P', unit='mm', format='A4')
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -173,8 +367,13 @@ def build_pdf(programs_df: pd.DataFrame, trainees_df: pd.DataFrame, registration
         ("Enrollment Rate", f"{enrollment_rate:.1f}%"),
         ("Avg Attendance", f"{avg_attendance:.1f}%" if avg_attendance == avg_attendance else "N/A"),
     ]
-    for k, v in metrics:
-        pdf.cell(0, 6, shape(f"- {k}: {v}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    # Section body helper: one cell per row, since shape() has already put each row in visual order
+    # and wrapping it afterwards would split the Arabic text at the wrong end
+    def lines(rows):
+        for row in rows:
+            pdf.cell(0, 6, row, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    lines(shape(f"- {k}: {v}") for k, v in metrics)
 
     # Section helper
     def section(title: str):
@@ -183,34 +382,22 @@ def build_pdf(programs_df: pd.DataFrame, trainees_df: pd.DataFrame, registration
         pdf.cell(0, 8, title, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.set_font(base_font, '', 11)
 
-    # Top programs
-    section('Top Training Programs')
-    for name, count in top_programs.items():
-        pdf.cell(0, 6, shape(f"{name}: {int(count)}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-    # Training Locations
-    section('Training Locations Distribution')
-    for name, count in location_counts.items():
-        pdf.cell(0, 6, shape(f"{name}: {int(count)} courses"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-    # Governorates
-    section('Top Governorates (Registrations)')
-    for name, count in gov_counts.items():
-        pdf.cell(0, 6, shape(f"{name}: {int(count)}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    # Top programs, training locations, governorates
+    for key, title, _, _, suffix in COUNT_SECTIONS:
+        section(title)
+        lines(shape(f"{name}: {int(count)}{suffix}") for name, count in summaries[key].items())
 
     # Plan vs Actual
     section('Program-wise Planned vs Actual Registrations (Top)')
-    plan_by_program = programs_df.groupby('البرنامج التدريبي').size().reset_index(name='planned_courses')
-    actual_by_program = registration_df.groupby('البرنامج التدريبي').size().reset_index(name='actual_registrations')
-    comparison = plan_by_program.merge(actual_by_program, on='البرنامج التدريبي', how='outer').fillna(0)
-    comparison['fulfillment_rate'] = (comparison['actual_registrations'] / (comparison['planned_courses'] * 17.75) * 100).fillna(0).round(1)
-    comparison = comparison.sort_values('planned_courses', ascending=False).head(15)
+    comparison = summaries['comparison'].head(15)
+    rows = []
     for _, row in comparison.iterrows():
         prog = str(row['البرنامج التدريبي'])
         planned = int(row['planned_courses'])
         actual = int(row['actual_registrations'])
         rate = float(row['fulfillment_rate'])
-        pdf.cell(0, 6, shape(f"{prog} — Planned: {planned}, Registrations: {actual}, Fulfillment: {rate:.1f}%"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        rows.append(shape(f"{prog} — Planned: {planned}, Registrations: {actual}, Fulfillment: {rate:.1f}%"))
+    lines(rows)
 
     pdf.ln(4)
     pdf.set_font(base_font, '', 9)
@@ -224,13 +411,37 @@ def build_pdf(programs_df: pd.DataFrame, trainees_df: pd.DataFrame, registration
         print(f"PDF was open; saved as: {alt}")
 
 
+def load_summaries(file_path: Path) -> dict:
+    # The summaries are a pure function of the workbook and of compute_summaries, so they are pickled
+    # next to the Parquet sidecars under SUMMARIES_VERSION and reused while iterating on report layout
+    summaries_path = cache_dir_for(file_path) / f'summaries-v{SUMMARIES_VERSION}.pkl'
+    try:
+        with summaries_path.open('rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass  # Missing, unreadable or written by an incompatible pandas: recompute
+
+    summaries = compute_summaries(ReportArrays.from_frames(*load_data(file_path)))
+    try:
+        tmp_path = summaries_path.with_suffix('.tmp')
+        with tmp_path.open('wb') as f:
+            pickle.dump(summaries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(summaries_path)
+    except OSError:
+        pass  # Read-only location: nothing to reuse next run
+    return summaries
+
+
 def main():
-    programs_df, trainees_df, registration_df = load_data(FILE_PATH)
-    html = build_report(programs_df, trainees_df, registration_df)
-    OUTPUT_HTML.write_text(html, encoding='utf-8')
-    print(f"Report written to: {OUTPUT_HTML}")
-    build_pdf(programs_df, trainees_df, registration_df)
-    print(f"PDF written to: {OUTPUT_PDF}")
+    summaries = load_summaries(FILE_PATH)
+    # HTML and PDF only read the shared summaries, so they are written side by side
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        html_done = pool.submit(write_report, OUTPUT_HTML, summaries)
+        pdf_done = pool.submit(build_pdf, summaries)
+        html_done.result()
+        print(f"Report written to: {OUTPUT_HTML}")
+        pdf_done.result()
+        print(f"PDF written to: {OUTPUT_PDF}")
 
 
 if __name__ == '__main__':
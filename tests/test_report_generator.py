@@ -0,0 +1,15 @@
+import report_generator as rg
+
+
+def test_shape_keeps_brackets_paired_in_rtl_text():
+    shaped = rg.shape('مركز (المعلومات)')
+    assert shaped.index('(') < shaped.index(')')
+
+
+def test_shape_keeps_brackets_around_embedded_latin():
+    shaped = rg.shape('مركز (IT) الصحة')
+    assert '(IT)' in shaped
+
+
+def test_shape_returns_ascii_unchanged():
+    assert rg.shape('Total Courses (Q2)') == 'Total Courses (Q2)'